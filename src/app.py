@@ -3,8 +3,10 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import time
-from env import GridWorld
-from q_learning import QLearningAgent
+from mazes import default_maze, generate_maze
+from trace_log import episode_cells, read_trace, recorded_episodes, visit_counts
+from training_jobs import LRUCache, TrainingJob, job_key
+from visualize import render_policy, render_trace, render_visits
 
 st.set_page_config(page_title="AI 길찾기 교실", page_icon="🧠", layout="wide")
 
@@ -23,18 +25,29 @@ gamma = st.sidebar.slider("감가율 (Discount Factor)", 0.5, 0.99, 0.9, step=0.
 epsilon = st.sidebar.slider("탐험 확률 초기값 (Epsilon)", 0.0, 1.0, 1.0, step=0.05)
 decay = st.sidebar.slider("Epsilon 감소율", 0.90, 0.999, 0.995, step=0.001)
 
+AGENT_TYPES = {"Q-러닝": "q", "Q(λ)": "qlambda", "Dyna-Q": "dyna", "우선순위 스위핑": "prioritized"}
+agent_label = st.sidebar.selectbox("에이전트", list(AGENT_TYPES))
+agent_type = AGENT_TYPES[agent_label]
+planning_steps = 10
+lam = 0.9
+if agent_type in ("dyna", "prioritized"):
+    planning_steps = st.sidebar.slider("스텝당 계획 업데이트 수", 1, 50, 10)
+if agent_type == "qlambda":
+    lam = st.sidebar.slider("흔적 감쇠 λ (Lambda)", 0.0, 1.0, 0.9, step=0.05)
+
 # ----- Maze 설정 -----
 st.sidebar.subheader("🏁 미로 선택")
-maze_type = st.sidebar.selectbox("환경 선택", ["기본 미로", "좁은 통로형", "장애물 밀집형"])
+maze_type = st.sidebar.selectbox("환경 선택", ["기본 미로", "좁은 통로형", "장애물 밀집형", "자동 생성 미로"])
 
+start, goal = (0, 0), (4, 4)
 if maze_type == "기본 미로":
-    grid = [
-        [0,0,0,0,0],
-        [0,1,1,1,0],
-        [0,0,0,1,0],
-        [0,1,0,0,0],
-        [0,0,0,1,0],
-    ]
+    grid, start, goal = default_maze()
+elif maze_type == "자동 생성 미로":
+    maze_size = st.sidebar.slider("미로 크기", 5, 41, 11, step=2)
+    maze_seed = st.sidebar.number_input("미로 시드", 0, 9999, 0)
+    braid = st.sidebar.slider("순환 경로 비율 (braid)", 0.0, 1.0, 0.0, step=0.1)
+    grid, start, goal = generate_maze(maze_size, maze_size, seed=int(maze_seed), braid=braid)
+    grid = grid.tolist()
 elif maze_type == "좁은 통로형":
     grid = [
         [0,0,1,0,0],
@@ -52,12 +65,18 @@ else:
         [0,1,1,1,0],
     ]
 
-start, goal = (0, 0), (4, 4)
+st.sidebar.subheader("🎬 에피소드 기록")
+trace_every = st.sidebar.slider("궤적 기록 간격 (0이면 기록 안 함)", 0, 200, 20, step=10)
 
 st.sidebar.markdown("---")
 run_training = st.sidebar.button("🚀 학습 시작")
 
 # ----- 학습 및 시각화 -----
+@st.cache_resource
+def get_job_cache():
+    # 모든 세션이 공유하는 학습 작업 캐시 (같은 미로·설정이면 다시 학습하지 않음)
+    return LRUCache(max_size=32)
+
 def visualize_policy(agent, grid):
     n_rows, n_cols = len(grid), len(grid[0])
     fig, ax = plt.subplots()
@@ -69,50 +88,83 @@ def visualize_policy(agent, grid):
     ax.invert_yaxis()
 
     ACTION_SYMBOL = {0: '↑', 1: '→', 2: '↓', 3: '←'}
+    render_policy(ax, grid, agent.Q, start, goal, symbols=ACTION_SYMBOL)
+    st.pyplot(fig)
 
-    for r in range(n_rows):
-        for c in range(n_cols):
-            if grid[r][c] == 1:
-                ax.add_patch(plt.Rectangle((c, r), 1, 1, color='black'))
-            elif (r,c) == start:
-                ax.add_patch(plt.Rectangle((c, r), 1, 1, color='lightblue'))
-                ax.text(c+0.5, r+0.5, "S", ha='center', va='center', fontsize=16)
-            elif (r,c) == goal:
-                ax.add_patch(plt.Rectangle((c, r), 1, 1, color='lightgreen'))
-                ax.text(c+0.5, r+0.5, "G", ha='center', va='center', fontsize=16)
-            else:
-                idx = r * n_cols + c
-                a = int(np.argmax(agent.Q[idx]))
-                ax.text(c+0.5, r+0.5, ACTION_SYMBOL[a], ha='center', va='center', fontsize=14)
+def _maze_axes():
+    fig, ax = plt.subplots()
+    ax.set_xticks([])
+    ax.set_yticks([])
+    return fig, ax
+
+def show_replay(job):
+    """학습 중 기록한 궤적 로그를 memmap으로 열어 에피소드를 넘겨 보거나 재생하고, 방문 히트맵을 그린다."""
+    trace = read_trace(job.trace_path)
+    recorded = recorded_episodes(trace).tolist()
+    if not recorded:
+        return
+    env = job.env
+
+    st.subheader("🎬 에피소드 재생")
+    episode = st.select_slider("기록된 에피소드 번호", options=recorded, value=recorded[-1])
+    cells = episode_cells(trace, episode, env)
+    step = st.slider("스텝", 0, len(cells) - 1, len(cells) - 1)
+    frame = st.empty()
+
+    def draw(t):
+        fig, ax = _maze_axes()
+        render_trace(ax, env.grid, env.start, env.goal, cells[:t + 1])
+        ax.set_title(f"Episode {episode} | step {t}/{len(cells) - 1}")
+        frame.pyplot(fig)
+        plt.close(fig)
+
+    if st.button("▶ 재생"):
+        # 긴 에피소드도 최대 60프레임으로 나눠 보여줌
+        for t in np.unique(np.linspace(0, len(cells) - 1, min(len(cells), 60)).astype(int)):
+            draw(t)
+            time.sleep(0.05)
+    else:
+        draw(step)
+
+    st.subheader("🔥 상태 방문 히트맵")
+    first, last = recorded[0], recorded[-1]
+    if len(recorded) > 1:
+        first, last = st.select_slider("에피소드 구간", options=recorded, value=(first, last))
+    fig, ax = _maze_axes()
+    fig.colorbar(render_visits(ax, env, visit_counts(trace, env.n_states, first, last)), ax=ax, label="방문 횟수")
     st.pyplot(fig)
+    plt.close(fig)
 
 if run_training:
+    params = dict(lr=lr, gamma=gamma, epsilon=epsilon, decay=decay, planning_steps=planning_steps, lam=lam)
+    key = job_key(grid, start, goal, agent_type, episodes=episodes, trace_every=trace_every, **params)
+    job, created = get_job_cache().get_or_create(
+        key, lambda: TrainingJob(grid, start, goal, agent_type=agent_type, episodes=episodes,
+                                 trace_every=trace_every or None, **params).start())
+    # 재생 화면의 슬라이더를 움직이면 앱이 다시 실행되므로 마지막 작업을 세션에 기억해 둠
+    st.session_state["job_key"] = key
+    if not created:
+        st.caption("⚡ 같은 설정으로 학습한 결과를 재사용합니다.")
+
     st.subheader("📚 학습 진행 중...")
-    env = GridWorld(grid, start, goal)
-    agent = QLearningAgent(env.n_states, env.n_actions, lr=lr, gamma=gamma,
-                           epsilon=epsilon, decay=decay)
-    rewards = []
-    success = 0
     progress = st.progress(0)
     chart = st.empty()
 
-    for ep in range(episodes):
-        s = env.reset()
-        total_reward = 0
-        for _ in range(100):
-            a = agent.choose_action(s)
-            s_next, r, done = env.step(a)
-            agent.learn(s, a, r, s_next, done)
-            s = s_next
-            total_reward += r
-            if done:
-                success += 1
-                break
-        agent.decay_epsilon()
-        rewards.append(total_reward)
-        if ep % (episodes//100) == 0:
-            progress.progress(ep / episodes)
-    progress.progress(1.0)
+    # 학습은 백그라운드 스레드에서 진행되고, 여기서는 배치 단위로 갱신된 결과만 그린다
+    shown = -1
+    while True:
+        episodes_done, rewards, success, finished = job.snapshot()
+        if episodes_done != shown:
+            shown = episodes_done
+            progress.progress(episodes_done / episodes)
+            chart.line_chart(rewards)
+        if finished:
+            break
+        time.sleep(0.2)
+    if job.error is not None:
+        st.error(f"학습 중 오류가 발생했습니다: {job.error}")
+        st.stop()
+    agent, real_steps = job.agent, job.real_steps
 
     # 결과 시각화
     st.success("✅ 학습 완료!")
@@ -121,6 +173,9 @@ if run_training:
 
     st.metric("최근 100회 평균 보상", f"{avg_reward:.3f}")
     st.metric("전체 성공률", f"{success_rate:.2%}")
+    st.metric("실제 환경 스텝", f"{real_steps:,}")
+    if agent_type in ("dyna", "prioritized"):
+        st.metric("계획 업데이트", f"{agent.planning_updates:,}")
 
     st.subheader("📈 보상 변화 그래프")
     fig, ax = plt.subplots()
@@ -134,6 +189,10 @@ if run_training:
     visualize_policy(agent, grid)
 
     st.balloons()
-else:
+elif "job_key" not in st.session_state:
     st.info("왼쪽 설정을 조정하고 **[🚀 학습 시작]** 버튼을 눌러보세요!")
 
+last_job = get_job_cache().get(st.session_state.get("job_key"))
+if last_job is not None and last_job.done and last_job.error is None and last_job.trace_path is not None:
+    show_replay(last_job)
+
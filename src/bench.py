@@ -0,0 +1,176 @@
+# src/bench.py
+import os
+# 그래프 창 없이 실행되도록 matplotlib 백엔드를 먼저 고정
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+import numpy as np
+
+from compare_baseline import random_baseline
+from env import GridWorld
+from kernels import HAVE_NUMBA
+from mazes import default_maze, generate_maze
+from q_learning import QLearningAgent
+from train import train_and_save
+
+DEFAULT_SIZES = (5, 21, 101)
+
+def make_maze(size, seed):
+    """size=5는 기본 미로, 그 외에는 seed로 만든 size×size 미로"""
+    if size == 5:
+        return default_maze()
+    return generate_maze(size, size, seed=seed, braid=0.2)
+
+def _timed(fn, n):
+    t0 = time.perf_counter()
+    fn(n)
+    return n / (time.perf_counter() - t0)
+
+def bench_env_step(maze, seed, n=200_000):
+    env = GridWorld(*maze)
+    actions = np.random.default_rng(seed).integers(4, size=n).tolist()
+    env.reset()
+
+    def run(n):
+        step = env.step
+        for a in actions[:n]:
+            step(a)
+    return _timed(run, n)
+
+def bench_choose_action(maze, seed, n=200_000):
+    env = GridWorld(*maze)
+    agent = QLearningAgent(env.n_states, env.n_actions, epsilon=0.1, seed=seed)
+    states = np.random.default_rng(seed).integers(env.n_states, size=n).tolist()
+
+    def run(n):
+        choose = agent.choose_action
+        for s in states[:n]:
+            choose(s)
+    return _timed(run, n)
+
+def bench_learn(maze, seed, n=200_000):
+    env = GridWorld(*maze)
+    agent = QLearningAgent(env.n_states, env.n_actions, seed=seed)
+    rng = np.random.default_rng(seed)
+    s = rng.integers(env.n_states, size=n).tolist()
+    a = rng.integers(4, size=n).tolist()
+    s_next = rng.integers(env.n_states, size=n).tolist()
+
+    def run(n):
+        learn = agent.learn
+        for i in range(n):
+            learn(s[i], a[i], -0.04, s_next[i], False)
+    return _timed(run, n)
+
+def bench_train(maze, seed, episodes=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        train_and_save(results_dir=tmp, episodes=episodes, maze=maze,
+                       seed=seed, save_plots=False, verbose=False)
+        return episodes / (time.perf_counter() - t0)
+
+def bench_train_fused(maze, seed, episodes=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        # numba 컴파일 시간은 제외하도록 한 에피소드로 먼저 예열
+        train_and_save(results_dir=tmp, episodes=1, maze=maze, seed=seed,
+                       save_plots=False, verbose=False, backend="fused")
+        t0 = time.perf_counter()
+        train_and_save(results_dir=tmp, episodes=episodes, maze=maze,
+                       seed=seed, save_plots=False, verbose=False, backend="fused")
+        return episodes / (time.perf_counter() - t0)
+
+def bench_random_baseline(maze, seed, episodes=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        random_baseline(results_dir=tmp, episodes=episodes, maze=maze,
+                        seed=seed, save_plots=False, verbose=False)
+        return episodes / (time.perf_counter() - t0)
+
+# (이름, 함수, 단위)
+BENCHMARKS = [
+    ("env_step", bench_env_step, "steps/s"),
+    ("choose_action", bench_choose_action, "calls/s"),
+    ("learn", bench_learn, "calls/s"),
+    ("train_episodes", bench_train, "episodes/s"),
+    ("train_episodes_fused", bench_train_fused, "episodes/s"),
+    ("random_baseline", bench_random_baseline, "episodes/s"),
+]
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seeds=(0, 1, 2), names=None):
+    """미로 크기별로 각 벤치마크를 seed마다 실행하고 처리량의 중앙값을 기록한다."""
+    results = []
+    for size in sizes:
+        for name, fn, unit in BENCHMARKS:
+            if names and name not in names:
+                continue
+            values = [fn(make_maze(size, seed), seed) for seed in seeds]
+            results.append({
+                "name": name,
+                "size": size,
+                "unit": unit,
+                "value": float(np.median(values)),
+                "runs": [float(v) for v in values],
+            })
+            print(f"[벤치] {name:20s} size={size:<5d} {results[-1]['value']:>14,.1f} {unit}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": HAVE_NUMBA,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seeds": list(seeds),
+        },
+        "results": results,
+    }
+
+def compare(baseline, current, threshold=0.15):
+    """처리량이 기준보다 threshold 비율 넘게 떨어진 항목 목록을 돌려준다."""
+    base = {(r["name"], r["size"]): r["value"] for r in baseline["results"]}
+    regressions = []
+    for r in current["results"]:
+        key = (r["name"], r["size"])
+        if key not in base:
+            continue
+        change = r["value"] / base[key] - 1.0
+        if change < -threshold:
+            regressions.append({"name": r["name"], "size": r["size"],
+                                "baseline": base[key], "current": r["value"], "change": change})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GridWorld / Q-러닝 성능 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--only", nargs="+", help="실행할 벤치마크 이름")
+    parser.add_argument("--out", default="results/bench.json")
+    parser.add_argument("--baseline", help="비교할 기준 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=0.15, help="허용 처리량 감소 비율")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.seeds, args.only)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[완료] 벤치마크 결과가 '{args.out}'에 저장되었습니다.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        for r in regressions:
+            print(f"[회귀] {r['name']} size={r['size']}: {r['baseline']:,.1f} → {r['current']:,.1f} "
+                  f"({r['change']:+.1%})")
+        if regressions:
+            return 1
+        print("[비교] 성능 회귀 없음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
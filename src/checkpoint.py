@@ -0,0 +1,95 @@
+# src/checkpoint.py
+import os
+import json
+import struct
+import hashlib
+
+import numpy as np
+
+# 파일 구조: MAGIC(8) | 헤더 길이(uint64 LE) | JSON 헤더 | 0 패딩 | Q 배열 원본 바이트 (C 순서)
+# 배열 시작 위치를 ALIGN 배수로 맞춰 np.memmap으로 복사 없이 열 수 있게 한다.
+MAGIC = b"QCKPT\x00\x01\x00"
+ALIGN = 64
+
+def maze_hash(env):
+    """미로 구조와 보상 설정이 같은지 확인하기 위한 해시"""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(env.grid, dtype=np.uint8).tobytes())
+    h.update(repr((env.grid.shape, tuple(env.start), tuple(env.goal),
+                   env.step_reward, env.goal_reward, env.obstacle_reward,
+                   env.compact)).encode("utf-8"))
+    return h.hexdigest()
+
+def save_checkpoint(path, Q, **metadata):
+    """Q 배열과 메타데이터(JSON 직렬화 가능 값)를 한 파일에 쓴다. 임시 파일에 쓴 뒤 교체한다."""
+    Q = np.ascontiguousarray(Q)
+    header = json.dumps({
+        "dtype": Q.dtype.str,
+        "shape": list(Q.shape),
+        "metadata": metadata,
+    }).encode("utf-8")
+    offset = len(MAGIC) + 8 + len(header)
+    padding = (-offset) % ALIGN
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\x00" * padding)
+        f.write(Q.tobytes())
+    os.replace(tmp_path, path)
+
+def read_header(path):
+    """(헤더 dict, 배열 시작 오프셋)"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a Q-table checkpoint: {path}")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    offset = len(MAGIC) + 8 + header_len
+    return header, offset + (-offset) % ALIGN
+
+def load_checkpoint(path, mmap=True):
+    """
+    (Q, metadata)를 돌려준다.
+    mmap=True면 Q는 읽기 전용 np.memmap이라 큰 Q-table도 복사 없이 열린다.
+    """
+    header, offset = read_header(path)
+    dtype = np.dtype(header["dtype"])
+    shape = tuple(header["shape"])
+    if mmap:
+        Q = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+    else:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            Q = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+    return Q, header["metadata"]
+
+def agent_state(agent, env, episode, **hyperparameters):
+    """체크포인트 메타데이터로 저장할 에이전트 학습 상태"""
+    state = {
+        "epsilon": float(agent.epsilon),
+        "episode": int(episode),
+        "rng_state": agent.rng.bit_generator.state,
+        "maze_hash": maze_hash(env),
+        "hyperparameters": hyperparameters,
+    }
+    if hasattr(agent, "planning_updates"):
+        # 이어서 학습해도 요약의 계획 업데이트 수가 처음부터의 누적값이 되도록
+        state["planning_updates"] = int(agent.planning_updates)
+    return state
+
+def restore_agent(agent, env, path):
+    """체크포인트의 Q, epsilon, RNG 상태를 agent에 복원하고 이어서 시작할 에피소드 번호를 돌려준다."""
+    Q, meta = load_checkpoint(path)
+    if meta["maze_hash"] != maze_hash(env):
+        raise ValueError(f"Checkpoint was trained on a different maze: {path}")
+    if Q.shape != agent.Q.shape:
+        raise ValueError(f"Checkpoint Q shape {Q.shape} does not match agent {agent.Q.shape}")
+    agent.Q[:] = Q
+    agent.epsilon = meta["epsilon"]
+    agent.rng.bit_generator.state = meta["rng_state"]
+    if hasattr(agent, "planning_updates"):
+        agent.planning_updates = meta.get("planning_updates", 0)
+    return meta["episode"]
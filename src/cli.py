@@ -0,0 +1,280 @@
+# src/cli.py
+"""
+전체 파이프라인 명령줄 진입점.
+
+    python src/cli.py train --episodes 5000 --maze-size 41 --no-plots
+    python src/cli.py baseline --mode analytic
+    python src/cli.py visualize
+    python src/cli.py report
+    python src/cli.py sweep --random 20 --seeds 0 1 2
+    python src/cli.py bench --sizes 5 21
+    python src/cli.py pipeline --out results
+    python src/cli.py curriculum --maze-size 41 --braid 0.3 --upscale 3 --factors 3
+    python src/cli.py serve --q-table results/q_table.qckpt
+    python src/cli.py loadgen --spawn --q-table results/q_table.qckpt
+
+각 하위 명령은 실행될 때만 해당 모듈을 불러온다.
+matplotlib, pandas, reportlab은 그래프/표/보고서가 실제로 필요한 함수 안에서만 불러오므로
+--no-plots 학습이나 스윕 작업 프로세스는 이들의 로딩(폰트 캐시 등)을 기다리지 않는다.
+"""
+import os
+import sys
+import argparse
+
+# 창을 띄우지 않고 파일로만 저장
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+def _maze(args):
+    """--maze-size가 0이면 기본 5×5 미로, 아니면 생성 미로"""
+    if not args.maze_size:
+        return None
+    from mazes import generate_maze
+    return generate_maze(args.maze_size, args.maze_size, seed=args.maze_seed, braid=args.braid)
+
+def cmd_train(args):
+    from train import train_and_save
+    train_and_save(results_dir=args.results_dir, episodes=args.episodes, max_steps=args.max_steps,
+                   lr=args.lr, gamma=args.gamma, epsilon=args.epsilon, min_epsilon=args.min_epsilon,
+                   decay=args.decay, seed=args.seed, save_plots=not args.no_plots, verbose=not args.quiet,
+                   maze=_maze(args), compact=args.compact, dtype=args.dtype,
+                   policy_patience=args.policy_patience, q_tol=args.q_tol,
+                   success_threshold=args.success_threshold,
+                   agent_type=args.agent, planning_steps=args.planning_steps,
+                   lam=args.lam, trace_type=args.trace_type,
+                   resume_from=args.resume_from, checkpoint_every=args.checkpoint_every,
+                   save_csv=args.save_csv, backend=args.backend,
+                   workers=args.workers, lock_stripes=args.lock_stripes, trace_every=args.trace_every)
+
+def cmd_baseline(args):
+    from compare_baseline import random_baseline
+    random_baseline(results_dir=args.results_dir, episodes=args.episodes, max_steps=args.max_steps,
+                    maze=_maze(args), seed=args.seed, save_plots=not args.no_plots,
+                    verbose=not args.quiet, mode=args.mode)
+
+def cmd_evaluate(args):
+    from evaluate import evaluate
+    evaluate(results_dir=args.results_dir, methods=tuple(args.methods), n_runs=args.runs,
+             root_seed=args.seed, episodes=args.episodes, max_steps=args.max_steps,
+             maze=_maze(args), workers=args.workers, verbose=not args.quiet)
+
+def cmd_visualize(args):
+    from visualize import visualize_results
+    visualize_results(results_dir=args.results_dir, maze=_maze(args), q_path=args.q_table)
+
+def cmd_report(args):
+    from make_report import make_report
+    make_report(result_dir=args.results_dir)
+
+def cmd_sweep(args):
+    from sweep import DEFAULT_SPACE, grid_space, random_space, run_sweep
+    if args.random:
+        configs = random_space(DEFAULT_SPACE, args.random, seed=args.sample_seed)
+    else:
+        configs = grid_space(DEFAULT_SPACE)
+    run_sweep(configs, results_path=args.results_path, seeds=tuple(args.seeds), workers=args.workers)
+
+def cmd_pipeline(args):
+    import json
+    from pipeline import run_pipeline
+    config = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            config = json.load(f)
+    if args.no_plots:
+        config["plots"] = False
+    run_pipeline(config, cache_dir=args.cache_dir, out_dir=args.out, force=tuple(args.force))
+
+def cmd_curriculum(args):
+    from curriculum import obstacle_stages, resolution_stages, train_curriculum
+    from mazes import default_maze, upscale_maze
+    maze = _maze(args) or default_maze()
+    if args.upscale > 1:
+        maze = upscale_maze(maze, args.upscale)
+    if args.mode == "resolution":
+        stages = resolution_stages(maze, factors=tuple(args.factors))
+    else:
+        stages = obstacle_stages(maze, n_stages=args.stages, seed=args.seed)
+    train_curriculum(stages, results_dir=args.results_dir, episodes=args.episodes, max_steps=args.max_steps,
+                     stage_epsilon=args.stage_epsilon, check_every=args.check_every,
+                     compare_scratch=not args.no_scratch, seed=args.seed, verbose=not args.quiet,
+                     lr=args.lr, gamma=args.gamma)
+
+def _registry(args):
+    """--registry JSON, 없으면 --q-table과 미로 옵션으로 만든 미로 하나("default")"""
+    if args.registry:
+        from policy_server import load_registry
+        return load_registry(args.registry)
+    maze = {"size": args.maze_size, "seed": args.maze_seed, "braid": args.braid}
+    return {"default": {"q_table": os.path.abspath(args.q_table), "maze": maze}}
+
+def cmd_serve(args):
+    from policy_server import serve
+    serve(_registry(args), host=args.host, port=args.port, unix_path=args.unix_socket,
+          cache_size=args.cache_size)
+
+def cmd_loadgen(args):
+    import multiprocessing as mp
+    from policy_server import run_load, serve
+    server = None
+    if args.spawn:
+        # 같은 설정으로 서버를 별도 프로세스에 띄우고 준비될 때까지 기다린 뒤 부하를 보냄
+        ready = mp.Event()
+        server = mp.Process(target=serve, daemon=True, args=(_registry(args),),
+                            kwargs=dict(host=args.host, port=args.port, unix_path=args.unix_socket,
+                                        cache_size=args.cache_size, verbose=False, ready=ready))
+        server.start()
+        if not ready.wait(30):
+            raise RuntimeError("policy server did not start")
+    try:
+        for kind in args.kinds:
+            run_load(host=args.host, port=args.port, unix_path=args.unix_socket, maze_id=args.maze_id,
+                     kind=kind, requests=args.requests, batch=args.batch, concurrency=args.concurrency,
+                     hot_cells=args.hot_cells or None)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+def cmd_bench(args):
+    from bench import main as bench_main
+    return bench_main(args.extra)
+
+def _run_parent(episodes, seed=None):
+    """
+    실행 옵션 부모 파서. 부모 파서의 인자는 하위 명령끼리 같은 객체를 공유해 set_defaults가 서로 덮어쓰므로
+    기본값이 다른 하위 명령마다 새로 만든다.
+    """
+    run = argparse.ArgumentParser(add_help=False)
+    run.add_argument("--episodes", type=int, default=episodes)
+    run.add_argument("--max-steps", type=int, default=100)
+    run.add_argument("--seed", type=int, default=seed)
+    run.add_argument("--no-plots", action="store_true", help="그래프 없이 실행 (matplotlib을 불러오지 않음)")
+    return run
+
+def _common_parent(results_dir="results"):
+    """결과 폴더와 출력 옵션 부모 파서 (_run_parent와 같은 이유로 기본값이 다르면 새로 만듦)"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--results-dir", default=results_dir)
+    common.add_argument("--quiet", action="store_true", help="진행 상황 출력 끄기")
+    return common
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Q-러닝 미로 실험 파이프라인")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = _common_parent()
+
+    maze = argparse.ArgumentParser(add_help=False)
+    maze.add_argument("--maze-size", type=int, default=0, help="0이면 기본 5×5 미로")
+    maze.add_argument("--maze-seed", type=int, default=0)
+    maze.add_argument("--braid", type=float, default=0.0)
+
+    p = sub.add_parser("train", parents=[common, maze, _run_parent(2000)], help="Q-러닝/Dyna-Q 학습")
+    p.add_argument("--agent", choices=["q", "dyna", "prioritized", "qlambda"], default="q")
+    p.add_argument("--planning-steps", type=int, default=10)
+    p.add_argument("--lam", type=float, default=0.9, help="Q(λ)의 λ")
+    p.add_argument("--trace-type", choices=["replacing", "accumulating"], default="replacing")
+    p.add_argument("--lr", type=float, default=0.1)
+    p.add_argument("--gamma", type=float, default=0.99)
+    p.add_argument("--epsilon", type=float, default=1.0)
+    p.add_argument("--min-epsilon", type=float, default=0.01)
+    p.add_argument("--decay", type=float, default=0.995)
+    p.add_argument("--compact", action="store_true", help="벽을 뺀 상태 인덱싱")
+    p.add_argument("--dtype", choices=["float64", "float32", "float16"], default="float64")
+    p.add_argument("--backend", choices=["python", "fused"], default="python")
+    p.add_argument("--workers", type=int, default=1, help="2 이상이면 공유 메모리 Q로 병렬 학습")
+    p.add_argument("--lock-stripes", type=int, default=0, help="0이면 잠금 없음(Hogwild)")
+    p.add_argument("--policy-patience", type=int)
+    p.add_argument("--q-tol", type=float)
+    p.add_argument("--success-threshold", type=float)
+    p.add_argument("--resume-from")
+    p.add_argument("--checkpoint-every", type=int)
+    p.add_argument("--save-csv", action="store_true")
+    p.add_argument("--trace-every", type=int, help="k 에피소드마다 한 에피소드의 궤적을 trace.bin에 기록")
+    p.set_defaults(func=cmd_train)
+
+    p = sub.add_parser("baseline", parents=[common, maze, _run_parent(300)], help="무작위 탐색 대조군")
+    p.add_argument("--mode", choices=["simulate", "analytic"], default="simulate")
+    p.set_defaults(func=cmd_baseline)
+
+    p = sub.add_parser("evaluate", parents=[common, maze, _run_parent(300, seed=0)], help="다중 시드 평가와 신뢰구간")
+    p.add_argument("--methods", nargs="+", default=["baseline", "q"])
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_evaluate)
+
+    p = sub.add_parser("visualize", parents=[common, maze], help="정책/경로/전체 칸 분석 그림")
+    p.add_argument("--q-table", help="기본값: results-dir/q_table.qckpt")
+    p.set_defaults(func=cmd_visualize)
+
+    p = sub.add_parser("report", parents=[common], help="PDF 비교 보고서")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("sweep", help="하이퍼파라미터 스윕")
+    p.add_argument("--results-path", default="results/sweep/sweep_results.csv")
+    p.add_argument("--random", type=int, default=0, help="0이면 격자 탐색, N이면 무작위 N개 설정")
+    p.add_argument("--sample-seed", type=int, default=0)
+    p.add_argument("--seeds", type=int, nargs="+", default=[0])
+    p.add_argument("--workers", type=int)
+    p.set_defaults(func=cmd_sweep)
+
+    p = sub.add_parser("pipeline", help="캐시를 쓰는 baseline→train→evaluate→visualize→report 전체 실행")
+    p.add_argument("--config", help="DEFAULT_CONFIG를 덮어쓸 JSON 파일 (pipeline.py 참고)")
+    p.add_argument("--cache-dir", default=".cache/pipeline")
+    p.add_argument("--out", help="산출물을 모을 폴더 (기본: results/pipeline/<키>)")
+    p.add_argument("--force", nargs="+", default=[], help="캐시가 있어도 다시 실행할 단계")
+    p.add_argument("--no-plots", action="store_true")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("curriculum", parents=[_common_parent("results/curriculum"), maze], help="작은 미로부터 Q를 옮겨 가며 학습하고 처음부터 학습과 비교")
+    p.add_argument("--mode", choices=["resolution", "obstacles"], default="resolution",
+                   help="resolution: 줄인 미로부터, obstacles: 벽을 단계마다 늘려 가며")
+    p.add_argument("--factors", type=int, nargs="+", default=[4, 2], help="resolution 모드의 축소 배율")
+    p.add_argument("--stages", type=int, default=3, help="obstacles 모드의 단계 수")
+    p.add_argument("--upscale", type=int, default=1, help="미로 칸을 k×k 블록으로 늘려 통로가 넓은 큰 미로로")
+    p.add_argument("--episodes", type=int, default=5000, help="단계별 최대 에피소드")
+    p.add_argument("--max-steps", type=int, default=1000, help="마지막 미로 기준 에피소드 최대 스텝")
+    p.add_argument("--lr", type=float, default=0.1)
+    p.add_argument("--gamma", type=float, default=0.99)
+    p.add_argument("--stage-epsilon", type=float, default=0.1, help="두 번째 단계부터의 탐험 확률 초기값")
+    p.add_argument("--check-every", type=int, default=10, help="탐욕 경로 확인 간격 (에피소드)")
+    p.add_argument("--seed", type=int)
+    p.add_argument("--no-scratch", action="store_true", help="처음부터 학습하는 비교 실행 생략")
+    p.set_defaults(func=cmd_curriculum)
+
+    server = argparse.ArgumentParser(add_help=False)
+    server.add_argument("--registry", help='{"미로 id": {"q_table": 경로, "maze": {"size": ..}}} JSON')
+    server.add_argument("--q-table", default="results/q_table.qckpt", help="--registry가 없을 때 쓸 Q-table")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--unix-socket", help="TCP 대신 Unix 소켓 경로")
+    server.add_argument("--cache-size", type=int, default=4096, help="경로 LRU 캐시 항목 수")
+
+    p = sub.add_parser("serve", parents=[maze, server], help="Q-table 정책 질의 서버 (HTTP/JSON)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("loadgen", parents=[maze, server], help="정책 질의 서버 부하 측정")
+    p.add_argument("--spawn", action="store_true", help="서버를 직접 띄워서 측정")
+    p.add_argument("--maze-id", help="기본값: 첫 번째 미로")
+    p.add_argument("--kinds", nargs="+", choices=["actions", "paths"], default=["actions", "paths"])
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--batch", type=int, default=32)
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--hot-cells", type=int, default=256, help="질의가 몰리는 칸 수 (0이면 전체 칸에서 균등)")
+    p.set_defaults(func=cmd_loadgen)
+
+    p = sub.add_parser("bench", help="성능 벤치마크 (나머지 인자는 bench.py로 전달)")
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    # 모르는 인자는 bench만 받아서 bench.py에 그대로 넘김
+    if extra and args.func is not cmd_bench:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.extra = extra
+    return args.func(args) or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
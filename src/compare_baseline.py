@@ -1,43 +1,103 @@
 # src/compare_baseline.py
 import os
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from engine import HistoryRecorder, TrainingEngine
 from env import GridWorld
+from mazes import default_maze
 
-def default_maze():
-    grid = [
-        [0,0,0,0,0],
-        [0,1,1,1,0],
-        [0,0,0,1,0],
-        [0,1,0,0,0],
-        [0,0,0,1,0],
-    ]
-    start, goal = (0,0), (4,4)
-    return grid, start, goal
+class RandomAgent:
+    """학습하지 않고 매 스텝 무작위 행동을 고르는 대조군 에이전트"""
+    def __init__(self, n_actions, seed=None):
+        self.n_actions = n_actions
+        self.epsilon = 1.0
+        self.rng = np.random.default_rng(seed)
 
-def random_baseline(results_dir="results", episodes=300, max_steps=100):
+    def choose_action(self, state):
+        return int(self.rng.integers(self.n_actions))  # 무작위 행동
+
+    def learn(self, s, a, r, s_next, done):
+        return 0.0
+
+    def decay_epsilon(self):
+        pass
+
+def random_walk_stats(env, max_steps=100):
+    """
+    균등 무작위 정책의 max_steps 이내 성공 확률, 기대 보상, 기대 스텝 수를 정확히 계산한다.
+    시작 상태의 확률 분포를 전이표로 한 스텝씩 밀어 보내며 (희소 행렬-벡터 곱과 같은 연산)
+    목표로 흡수되는 확률을 뺀다. 확률이 0이 아닌 상태만 들고 다니므로
+    스텝당 비용이 미로 크기가 아니라 분포가 퍼진 범위에 비례한다.
+    """
+    mean_reward = env.reward.mean(axis=1)
+    done_prob = env.done.mean(axis=1)
+    # 흡수(목표 도달) 전이는 다음 분포에서 빠지도록 가중치를 0으로
+    weights = np.where(env.done, 0.0, 1.0 / env.n_actions)
+
+    active = np.array([env.start_state])
+    p = np.ones(1)
+    success_by_step = np.zeros(max_steps)
+    expected_reward = 0.0
+    expected_steps = 0.0
+    for t in range(max_steps):
+        if active.size == 0:
+            break
+        expected_steps += p.sum()
+        expected_reward += p @ mean_reward[active]
+        success_by_step[t] = p @ done_prob[active]
+        w = (p[:, None] * weights[active]).ravel()
+        active, inverse = np.unique(env.next_state[active].ravel()[w > 0], return_inverse=True)
+        p = np.bincount(inverse.ravel(), weights=w[w > 0], minlength=active.size)
+    return {
+        "success_prob": float(success_by_step.sum()),
+        "expected_reward": float(expected_reward),
+        "expected_steps": float(expected_steps),
+        # t+1번째 스텝에 처음 목표에 도달할 확률
+        "success_by_step": success_by_step,
+    }
+
+def random_baseline(results_dir="results", episodes=300, max_steps=100, maze=None,
+                    seed=None, save_plots=True, verbose=True, mode="simulate"):
+    """
+    mode="simulate": 무작위 에이전트로 episodes개 에피소드를 직접 실행 (기존 방식)
+    mode="analytic": random_walk_stats로 구한 정확한 성공 확률/기대 보상으로 요약과 그래프를 만든다.
+                     (에피소드마다 같은 기댓값이므로 잡음이 없고, 큰 미로에서도 수 초 안에 끝남)
+    """
     os.makedirs(results_dir, exist_ok=True)
-    grid, start, goal = default_maze()
-    env = GridWorld(grid, start, goal)
-    n_actions = env.n_actions
+    grid, start, goal = maze if maze is not None else default_maze()
+    if mode == "analytic":
+        env = GridWorld(grid, start, goal, compact=True)
+        stats = random_walk_stats(env, max_steps)
+        rewards = np.full(episodes, stats["expected_reward"])
+        success_history = np.full(episodes, stats["success_prob"])
+    elif mode == "simulate":
+        env = GridWorld(grid, start, goal)
+        history = HistoryRecorder()
+        engine = TrainingEngine(env, RandomAgent(env.n_actions, seed), max_steps=max_steps, callbacks=[history])
+        engine.run(episodes)
+        rewards, success_history = history.rewards, history.success
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
 
-    rewards = []
-    success_history = []
+    if save_plots:
+        save_baseline_plots(results_dir, rewards, success_history)
 
-    for ep in range(episodes):
-        state = env.reset()
-        total_reward = 0
-        success = 0
-        for step in range(max_steps):
-            action = np.random.randint(n_actions)  # 무작위 행동
-            s_next, reward, done = env.step(action)
-            total_reward += reward
-            if done:
-                success = 1
-                break
-        rewards.append(total_reward)
-        success_history.append(success)
+    # 요약
+    with open(os.path.join(results_dir, "baseline_summary.txt"), "w", encoding="utf-8") as f:
+        f.write(f"총 에피소드,{episodes}\n")
+        if mode == "analytic":
+            # 에피소드마다 성공 확률을 더한 기댓값이라 정수 횟수와 구분해 기록
+            f.write(f"기대 성공 횟수,{sum(success_history):.1f}\n")
+        else:
+            f.write(f"성공 횟수,{int(sum(success_history))}\n")
+        f.write(f"성공률,{sum(success_history)/episodes:.3f}\n")
+        f.write(f"평균 보상,{np.mean(rewards):.3f}\n")
+
+    if verbose:
+        print("[완료] 무학습 대조군 결과 생성 완료.")
+    return rewards, success_history
+
+def save_baseline_plots(results_dir, rewards, success_history):
+    import matplotlib.pyplot as plt
 
     # 그래프 저장
     plt.figure()
@@ -61,14 +121,5 @@ def random_baseline(results_dir="results", episodes=300, max_steps=100):
     plt.savefig(os.path.join(results_dir, "baseline_success.png"))
     plt.close()
 
-    # 요약
-    with open(os.path.join(results_dir, "baseline_summary.txt"), "w", encoding="utf-8") as f:
-        f.write(f"총 에피소드,{episodes}\n")
-        f.write(f"성공 횟수,{sum(success_history)}\n")
-        f.write(f"성공률,{sum(success_history)/episodes:.3f}\n")
-        f.write(f"평균 보상,{np.mean(rewards):.3f}\n")
-
-    print("[완료] 무학습 대조군 결과 생성 완료.")
-
 if __name__ == "__main__":
     random_baseline()
@@ -0,0 +1,187 @@
+# src/curriculum.py
+import os
+import csv
+
+import numpy as np
+
+from engine import Callback
+from env import GridWorld
+from metrics import read_metrics
+from solver import ROLLOUT_GOAL, greedy_rollout, shortest_path_policy
+from train import train_and_save
+
+def downsample_maze(maze, factor):
+    """
+    미로를 factor×factor 블록 단위로 줄인다. 블록 안 벽이 절반을 넘으면 벽으로 본다.
+    (모자란 가장자리는 벽으로 채움) 시작점과 목표는 자신이 속한 블록으로 옮긴다.
+    """
+    grid, start, goal = maze
+    grid = np.asarray(grid, dtype=np.uint8)
+    n_rows, n_cols = -(-grid.shape[0] // factor), -(-grid.shape[1] // factor)
+    padded = np.ones((n_rows * factor, n_cols * factor), dtype=np.uint8)
+    padded[:grid.shape[0], :grid.shape[1]] = grid
+    walls = padded.reshape(n_rows, factor, n_cols, factor).mean(axis=(1, 3))
+    coarse = (walls > 0.5).astype(np.uint8)
+    return coarse, (start[0] // factor, start[1] // factor), (goal[0] // factor, goal[1] // factor)
+
+def solvable(maze):
+    """시작점과 목표가 빈칸이고 시작점에서 목표에 갈 수 있는지"""
+    grid, start, goal = maze
+    grid = np.asarray(grid)
+    if grid[start] == 1 or grid[goal] == 1 or tuple(start) == tuple(goal):
+        return False
+    env = GridWorld(grid, start, goal)
+    status, _ = greedy_rollout(env, np.eye(env.n_actions)[shortest_path_policy(env)])
+    return bool(status[env.start_state] == ROLLOUT_GOAL)
+
+def resolution_stages(maze, factors=(4, 2)):
+    """
+    큰 배율부터 줄인 미로를 차례로 만들고 마지막에 원래 미로를 둔다.
+    줄이면서 길이 끊겨 목표에 갈 수 없게 된 단계는 뺀다.
+    """
+    stages = [downsample_maze(maze, f) for f in sorted(factors, reverse=True) if f > 1]
+    return [m for m in stages if solvable(m)] + [maze]
+
+def obstacle_stages(maze, n_stages=3, seed=None):
+    """
+    같은 크기에서 벽을 단계마다 조금씩 늘려 가는 미로 목록. (마지막이 원래 미로)
+    벽은 무작위 순서로 추가하고, 목표에 갈 수 없게 된 단계는 뺀다.
+    """
+    grid, start, goal = maze
+    grid = np.asarray(grid, dtype=np.uint8)
+    walls = np.flatnonzero(grid.ravel() == 1)
+    np.random.default_rng(seed).shuffle(walls)
+    stages = []
+    for k in range(1, n_stages):
+        partial = np.zeros_like(grid)
+        partial.ravel()[walls[:len(walls) * k // n_stages]] = 1
+        if solvable((partial, start, goal)):
+            stages.append((partial, start, goal))
+    return stages + [(grid, start, goal)]
+
+def stretch_values(q, env, ratio, gamma=0.99):
+    """
+    Q 값을 목표까지 남은 거리 d의 가치로 보고 거리를 ratio배 늘린 가치로 바꾼다.
+    (V(d) - c = γ^(d-1) * (목표 보상 - c), c = 스텝 보상 / (1 - γ))
+    해상도를 올리면 같은 경로가 ratio배 길어지므로, 그대로 옮긴 작은 미로의 가치는 너무 낙관적이라
+    갱신한 행동보다 안 가 본 행동이 좋아 보여 탐욕 정책이 제자리를 돈다. 단조 변환이라 행동 순서는 그대로다.
+    """
+    c = env.step_reward / (1 - gamma)
+    scale = env.goal_reward - c
+    x = np.asarray(q) - c
+    return c + np.sign(x) * np.abs(x) ** ratio / scale ** (ratio - 1)
+
+def transfer_q(q_src, env_src, env_dst, gamma=0.99):
+    """
+    env_src에서 학습한 Q를 env_dst의 칸 좌표로 옮긴다.
+    대상 칸 (r, c)는 원본 칸 (r * 원본 행 수 // 대상 행 수, c * 원본 열 수 // 대상 열 수)의 Q 행을 받고
+    (행동은 방향이라 해상도와 상관없음) 해상도가 다르면 stretch_values로 가치를 맞춘다.
+    대응 칸이 원본에서 벽이면 0으로 둔다.
+    """
+    rows, cols = np.divmod(env_dst.state_cells, env_dst.n_cols)
+    src_r = rows * env_src.n_rows // env_dst.n_rows
+    src_c = cols * env_src.n_cols // env_dst.n_cols
+    src_state = env_src.cell_index[src_r, src_c]
+    ok = (src_state >= 0) & (env_src.grid[src_r, src_c] != 1)
+    q = np.zeros((env_dst.n_states, env_dst.n_actions), dtype=np.asarray(q_src).dtype)
+    q[ok] = np.asarray(q_src)[src_state[ok]]
+    ratio = (env_dst.n_rows / env_src.n_rows + env_dst.n_cols / env_src.n_cols) / 2
+    if ratio != 1:
+        q[ok] = stretch_values(q[ok], env_dst, ratio, gamma)
+    return q
+
+class GreedyPathStopping(Callback):
+    """check_every 에피소드마다 탐욕 정책을 따라가 보고, 시작점에서 목표에 닿으면 종료."""
+    def __init__(self, env, check_every=10):
+        self.env = env
+        self.check_every = check_every
+
+    def on_episode_end(self, engine, result):
+        if (result.episode + 1) % self.check_every:
+            return
+        status, _ = greedy_rollout(self.env, engine.agent.Q)
+        if status[self.env.start_state] == ROLLOUT_GOAL:
+            engine.stop("탐욕 경로 도달")
+
+def _read_summary(path):
+    with open(path, encoding="utf-8") as f:
+        return dict(line.rstrip("\n").split(",", 1) for line in f if "," in line)
+
+def _stage_record(name, maze, stage_dir):
+    metrics = read_metrics(os.path.join(stage_dir, "metrics.bin"))
+    summary = _read_summary(os.path.join(stage_dir, "summary.txt"))
+    return {
+        "stage": name,
+        "shape": "x".join(map(str, np.shape(maze[0]))),
+        "episodes": len(metrics),
+        "env_steps": int(metrics["steps"].sum(dtype=np.int64)),
+        "final_success_rate": float(summary["최종 성공률"]),
+        "policy_agreement": float(summary["최적 행동 일치율"]),
+        "start_path_length": summary["시작점 경로 길이"],
+        "stop_reason": summary["종료 사유"],
+    }
+
+def train_curriculum(stages, results_dir="results/curriculum", episodes=5000, max_steps=1000,
+                     epsilon=1.0, stage_epsilon=0.1, check_every=10, success_threshold=None,
+                     compare_scratch=True, seed=None, verbose=True, **train_kwargs):
+    """
+    stages의 미로를 차례로 학습하면서 앞 단계의 Q를 transfer_q로 옮겨 다음 단계를 시작한다.
+    단계마다 check_every 에피소드마다 탐욕 경로가 시작점에서 목표에 닿는지 보고 닿으면 다음 단계로 넘어간다.
+    (success_threshold를 주면 최근 100 에피소드 성공률 조건도 함께 사용, episodes는 단계별 최대 에피소드)
+    첫 단계는 epsilon, 이후 단계는 stage_epsilon부터 탐험하고, max_steps는 마지막 미로 기준이며
+    작은 단계에서는 행 수 비율만큼 줄인다.
+
+    compare_scratch=True면 마지막 미로를 0부터 같은 종료 조건으로 학습해 실제 환경 스텝 합계를 비교한다.
+    결과는 results_dir/stage_<i>/, results_dir/scratch/와 results_dir/curriculum.csv에 저장한다.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    full_rows = np.shape(stages[-1][0])[0]
+    gamma = train_kwargs.get("gamma", 0.99)
+    records = []
+    env_prev, q_prev = None, None
+    for i, maze in enumerate(stages):
+        env = GridWorld(*maze)
+        q_init = transfer_q(q_prev, env_prev, env, gamma) if q_prev is not None else None
+        stage_dir = os.path.join(results_dir, f"stage_{i}")
+        if verbose:
+            print(f"[단계 {i + 1}/{len(stages)}] {env.n_rows}x{env.n_cols} 미로 학습")
+        agent, _ = train_and_save(results_dir=stage_dir, episodes=episodes,
+                                  max_steps=max(1, max_steps * env.n_rows // full_rows),
+                                  epsilon=epsilon if q_init is None else stage_epsilon,
+                                  success_threshold=success_threshold, maze=maze,
+                                  seed=None if seed is None else seed + i, q_init=q_init,
+                                  callbacks=[GreedyPathStopping(env, check_every)],
+                                  save_plots=False, verbose=False, **train_kwargs)
+        records.append(_stage_record(f"stage_{i}", maze, stage_dir))
+        env_prev, q_prev = env, agent.Q
+
+    curriculum_steps = sum(r["env_steps"] for r in records)
+    records.append({**records[-1], "stage": "curriculum_total", "env_steps": curriculum_steps,
+                    "episodes": sum(r["episodes"] for r in records)})
+    if compare_scratch:
+        scratch_dir = os.path.join(results_dir, "scratch")
+        train_and_save(results_dir=scratch_dir, episodes=episodes * len(stages), max_steps=max_steps,
+                       epsilon=epsilon, success_threshold=success_threshold, maze=stages[-1], seed=seed,
+                       callbacks=[GreedyPathStopping(GridWorld(*stages[-1]), check_every)],
+                       save_plots=False, verbose=False, **train_kwargs)
+        records.append(_stage_record("scratch", stages[-1], scratch_dir))
+
+    with open(os.path.join(results_dir, "curriculum.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(records[0]))
+        writer.writeheader()
+        writer.writerows(records)
+
+    if verbose:
+        for r in records:
+            print(f"  {r['stage']:<17} {r['shape']:>9} | 에피소드 {r['episodes']:>6} | 환경 스텝 {r['env_steps']:>10,} | "
+                  f"최종 성공률 {r['final_success_rate']:.3f} | 최적 행동 일치율 {r['policy_agreement']:.3f} | "
+                  f"시작점 경로 길이 {r['start_path_length']}")
+        if compare_scratch:
+            print(f"[비교] 커리큘럼은 처음부터 학습한 스텝의 {curriculum_steps / max(records[-1]['env_steps'], 1):.1%}를 썼습니다.")
+        print(f"[완료] 커리큘럼 학습이 끝났습니다. 결과가 '{results_dir}' 폴더에 저장되었습니다.")
+    return records
+
+if __name__ == "__main__":
+    from mazes import generate_maze, upscale_maze
+    maze = upscale_maze(generate_maze(21, 21, seed=0, braid=0.3), 3)
+    train_curriculum(resolution_stages(maze, factors=(3,)), seed=0)
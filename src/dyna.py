@@ -0,0 +1,111 @@
+# src/dyna.py
+import heapq
+from collections import defaultdict
+
+from q_learning import QLearningAgent
+
+class DynaQAgent(QLearningAgent):
+    """
+    관측한 전이를 모델로 저장하고, 실제 한 스텝마다 planning_steps번의 가상 업데이트를 수행하는 Dyna-Q 에이전트.
+    prioritized=True면 무작위 재생 대신 TD 오차가 큰 (상태, 행동)부터 처리하는 우선순위 스위핑을 사용한다.
+    (우선순위 큐 크기는 queue_size로 제한)
+    choose_action / learn 인터페이스는 QLearningAgent와 같아 그대로 바꿔 끼울 수 있다.
+    """
+    def __init__(self, n_states, n_actions, planning_steps=10, prioritized=False,
+                 theta=1e-4, queue_size=1000, **kwargs):
+        super().__init__(n_states, n_actions, **kwargs)
+        self.planning_steps = planning_steps
+        self.prioritized = prioritized
+        self.theta = theta
+        self.queue_size = queue_size
+
+        self.model = {}                        # (s, a) -> (r, s_next, done)
+        self.observed = []                     # 무작위 재생용 (s, a) 목록
+        self.predecessors = defaultdict(set)   # s_next -> {(s, a)}
+        self._queue = []                       # (-우선순위, 순번, (s, a))
+        self._queued = {}                      # (s, a) -> 큐에 있는 최대 우선순위
+        self._counter = 0
+
+        self.real_steps = 0
+        self.planning_updates = 0
+        # 마지막 learn()이 실제/계획 업데이트로 바꾼 행과 최대 변화량 (updated_rows)
+        self._updated_rows = []
+        self._max_delta = 0.0
+
+    def learn(self, s, a, r, s_next, done):
+        self.real_steps += 1
+        if (s, a) not in self.model:
+            self.observed.append((s, a))
+        self.model[(s, a)] = (r, s_next, done)
+        self.predecessors[s_next].add((s, a))
+
+        self._updated_rows = []
+        self._max_delta = 0.0
+        td_error = self._update(s, a, r, s_next, done)
+        if self.prioritized:
+            self._push_predecessors(s)
+            self._plan_prioritized()
+        else:
+            self._plan_random()
+        return td_error
+
+    def updated_rows(self, s, td_error):
+        return self._updated_rows, self._max_delta
+
+    def _update(self, s, a, r, s_next, done):
+        td_error = QLearningAgent.learn(self, s, a, r, s_next, done)
+        self._updated_rows.append(s)
+        delta = abs(self.lr * td_error)
+        if delta > self._max_delta:
+            self._max_delta = delta
+        return td_error
+
+    def _plan_random(self):
+        n = len(self.observed)
+        for i in self.rng.integers(n, size=self.planning_steps):
+            s, a = self.observed[i]
+            r, s_next, done = self.model[(s, a)]
+            self._update(s, a, r, s_next, done)
+        self.planning_updates += self.planning_steps
+
+    def _priority(self, s, a):
+        r, s_next, done = self.model[(s, a)]
+        target = r if done else r + self.gamma * self.Q[s_next].max()
+        return abs(target - self.Q[s, a])
+
+    def _push(self, key, priority):
+        if priority <= self.theta or self._queued.get(key, 0.0) >= priority:
+            return
+        self._queued[key] = priority
+        self._counter += 1
+        heapq.heappush(self._queue, (-priority, self._counter, key))
+        if len(self._queue) > 2 * self.queue_size:
+            self._trim()
+
+    def _trim(self):
+        # 오래된 중복 항목을 버리고 우선순위 상위 queue_size개만 남김
+        valid = [item for item in self._queue if self._queued.get(item[2]) == -item[0]]
+        self._queue = heapq.nsmallest(self.queue_size, valid)
+        heapq.heapify(self._queue)
+        self._queued = {key: -neg_p for neg_p, _, key in self._queue}
+
+    def _push_predecessors(self, s):
+        for key in self.predecessors.get(s, ()):
+            self._push(key, self._priority(*key))
+
+    def _plan_prioritized(self):
+        for _ in range(self.planning_steps):
+            key = None
+            while self._queue:
+                neg_p, _, candidate = heapq.heappop(self._queue)
+                if self._queued.get(candidate) == -neg_p:
+                    del self._queued[candidate]
+                    key = candidate
+                    break
+            if key is None:
+                break
+            s, a = key
+            r, s_next, done = self.model[key]
+            self._update(s, a, r, s_next, done)
+            self.planning_updates += 1
+            self._push_predecessors(s)
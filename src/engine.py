@@ -0,0 +1,238 @@
+# src/engine.py
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+PHASES = ("action", "env", "learn", "kernel", "bookkeeping")
+PHASE_NAMES = {"action": "행동 선택", "env": "환경 스텝", "learn": "TD 업데이트", "kernel": "융합 커널",
+               "bookkeeping": "기록/콜백"}
+BACKENDS = ("python", "fused")
+
+class Callback:
+    """
+    TrainingEngine 이벤트 훅. 필요한 메서드만 오버라이드하면 된다.
+    on_step은 오버라이드한 콜백에만 호출되므로 쓰지 않으면 스텝당 비용이 없다.
+    """
+    def on_train_start(self, engine):
+        pass
+
+    def on_episode_start(self, engine, episode):
+        pass
+
+    def on_step(self, engine, episode, step, state, action, reward, s_next, done, td_error):
+        pass
+
+    def on_episode_end(self, engine, result):
+        pass
+
+    def on_checkpoint(self, engine, episode):
+        pass
+
+    def on_train_end(self, engine):
+        pass
+
+class EpisodeResult:
+    __slots__ = ("episode", "reward", "steps", "success", "epsilon")
+
+    def __init__(self, episode, reward, steps, success, epsilon):
+        self.episode = episode
+        self.reward = reward
+        self.steps = steps
+        self.success = success
+        self.epsilon = epsilon
+
+class TrainingEngine:
+    """
+    choose_action → step → learn 에피소드 루프를 한곳에 모은 학습 엔진.
+    train.py, compare_baseline.py, 앱의 백그라운드 학습이 모두 이 루프를 쓴다.
+
+    profile=True면 단계별(행동 선택, 환경 스텝, TD 업데이트, 기록/콜백) 누적 시간을 timers에 기록한다.
+    스텝당 perf_counter 네 번 정도의 비용이라 켜 둔 채로 운영해도 된다.
+    콜백에서 engine.stop(reason)을 부르면 현재 에피소드가 끝난 뒤 학습을 멈춘다.
+
+    backend="fused"면 에피소드 하나를 kernels.q_episode 한 번으로 실행한다. (numba가 있으면 컴파일됨)
+    같은 시드에서 결과는 "python"과 같고, 스텝 단위 시간은 "kernel" 하나로 합쳐 기록된다.
+    QLearningAgent(float64)만 지원하며, on_step 콜백은 쓸 수 없다.
+    """
+    def __init__(self, env, agent, max_steps=100, callbacks=(), checkpoint_every=None, profile=True,
+                 backend="python"):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.env = env
+        self.agent = agent
+        self.max_steps = max_steps
+        self.callbacks = list(callbacks)
+        self.checkpoint_every = checkpoint_every
+        self.profile = profile
+        self.backend = backend
+        self.timers = dict.fromkeys(PHASES, 0.0)
+        self.total_steps = 0
+        self.episodes_run = 0
+        self.stop_reason = None
+
+    def stop(self, reason):
+        self.stop_reason = reason
+
+    def run(self, episodes, start_episode=0):
+        """start_episode부터 episodes 직전까지 학습하고 실제로 진행한 에피소드 수를 돌려준다."""
+        env, agent, callbacks = self.env, self.agent, self.callbacks
+        step_callbacks = [cb for cb in callbacks if type(cb).on_step is not Callback.on_step]
+        timers = self.timers
+        clock = perf_counter if self.profile else _no_clock
+        self.stop_reason = None
+        fused = None
+        if self.backend == "fused":
+            if step_callbacks:
+                raise ValueError("on_step callbacks are not supported by the fused backend")
+            from kernels import FusedQRunner
+            fused = FusedQRunner(env, agent)
+
+        for cb in callbacks:
+            cb.on_train_start(self)
+        for ep in range(start_episode, episodes):
+            for cb in callbacks:
+                cb.on_episode_start(self, ep)
+            state = env.reset()
+            total_reward = 0.0
+            success = 0
+            steps = 0
+
+            t0 = clock()
+            if fused is not None:
+                total_reward, steps, success = fused.run_episode(self.max_steps)
+                timers["kernel"] += clock() - t0
+            else:
+                for step in range(self.max_steps):
+                    action = agent.choose_action(state)
+                    t1 = clock()
+                    s_next, reward, done = env.step(action)
+                    t2 = clock()
+                    td_error = agent.learn(state, action, reward, s_next, done)
+                    t3 = clock()
+                    for cb in step_callbacks:
+                        cb.on_step(self, ep, step, state, action, reward, s_next, done, td_error)
+                    state = s_next
+                    total_reward += reward
+                    steps += 1
+                    t4 = clock()
+                    timers["action"] += t1 - t0
+                    timers["env"] += t2 - t1
+                    timers["learn"] += t3 - t2
+                    timers["bookkeeping"] += t4 - t3
+                    t0 = t4
+
+                    if done:
+                        success = 1
+                        break
+
+            agent.decay_epsilon()
+            self.total_steps += steps
+            self.episodes_run += 1
+            t0 = clock()
+            result = EpisodeResult(ep, total_reward, steps, success, agent.epsilon)
+            for cb in callbacks:
+                cb.on_episode_end(self, result)
+            if self.checkpoint_every is not None and (ep + 1) % self.checkpoint_every == 0:
+                for cb in callbacks:
+                    cb.on_checkpoint(self, ep + 1)
+            timers["bookkeeping"] += clock() - t0
+
+            if self.stop_reason is not None:
+                break
+        for cb in callbacks:
+            cb.on_train_end(self)
+        return self.episodes_run
+
+    def timing_report(self):
+        total = sum(self.timers.values()) or 1.0
+        # 백엔드에서 쓰지 않는 단계는 생략
+        phases = [p for p in PHASES if self.timers[p] > 0] or PHASES
+        return " | ".join(f"{PHASE_NAMES[p]} {self.timers[p]:.3f}s ({self.timers[p] / total:.0%})"
+                          for p in phases)
+
+def _no_clock():
+    return 0.0
+
+class HistoryRecorder(Callback):
+    """에피소드별 보상, 성공 여부, 스텝 수 기록"""
+    def __init__(self):
+        self.rewards = []
+        self.success = []
+        self.steps = []
+
+    def on_episode_end(self, engine, result):
+        self.rewards.append(result.reward)
+        self.success.append(result.success)
+        self.steps.append(result.steps)
+
+class EarlyStopping(Callback):
+    """
+    조기 종료 조건 (None이면 사용하지 않음, 매 에피소드 검사):
+      policy_patience  : 탐욕 정책이 이 에피소드 수만큼 바뀌지 않으면 종료
+      q_tol, q_window  : 최근 q_window 에피소드의 최대 Q 변화량이 q_tol 미만이면 종료
+      success_threshold: 최근 success_window 에피소드 성공률이 이 값 이상이면 종료
+    """
+    def __init__(self, policy_patience=None, q_tol=None, q_window=100,
+                 success_threshold=None, success_window=100):
+        self.policy_patience = policy_patience
+        self.q_tol = q_tol
+        self.q_window = q_window
+        self.success_threshold = success_threshold
+        self.success_window = success_window
+
+    def on_train_start(self, engine):
+        # 탐욕 정책을 캐시해 두고, 스텝마다 갱신된 행만 다시 argmax
+        self.greedy = np.argmax(engine.agent.Q, axis=1)
+        self.q_deltas = deque(maxlen=self.q_window)
+        self.recent_success = deque(maxlen=self.success_window)
+        self.max_q_delta = 0.0
+        self.last_policy_change = None
+
+    def on_episode_start(self, engine, episode):
+        # 정책이 마지막으로 바뀐 에피소드 (첫 에피소드 직전으로 시작). 그 이후 에피소드만 "안 바뀐" 에피소드로 센다
+        if self.last_policy_change is None:
+            self.last_policy_change = episode - 1
+
+    def on_step(self, engine, episode, step, state, action, reward, s_next, done, td_error):
+        # 계획 업데이트(Dyna)나 자격 흔적(Q(λ))으로 바뀐 다른 행까지 에이전트에게서 받아 검사
+        rows, delta = engine.agent.updated_rows(state, td_error)
+        if self.policy_patience is not None and len(rows):
+            rows = np.asarray(rows)
+            greedy = np.argmax(engine.agent.Q[rows], axis=1)
+            if (greedy != self.greedy[rows]).any():
+                self.greedy[rows] = greedy
+                self.last_policy_change = episode
+        if delta > self.max_q_delta:
+            self.max_q_delta = delta
+
+    def on_episode_end(self, engine, result):
+        self.q_deltas.append(self.max_q_delta)
+        self.max_q_delta = 0.0
+        self.recent_success.append(result.success)
+
+        ep = result.episode
+        if self.policy_patience is not None and ep - self.last_policy_change >= self.policy_patience:
+            engine.stop("정책 안정")
+        elif self.q_tol is not None and len(self.q_deltas) == self.q_window and max(self.q_deltas) < self.q_tol:
+            engine.stop("Q 변화 수렴")
+        elif (self.success_threshold is not None and len(self.recent_success) == self.success_window
+              and sum(self.recent_success) / self.success_window >= self.success_threshold):
+            engine.stop("성공률 도달")
+
+class SuccessStopping(Callback):
+    """
+    최근 window 에피소드 성공률이 threshold 이상이면 종료.
+    스텝 훅을 쓰지 않으므로 fused 백엔드와 병렬 학습에서도 쓸 수 있다.
+    """
+    def __init__(self, threshold, window=100):
+        self.threshold = threshold
+        self.window = window
+
+    def on_train_start(self, engine):
+        self.recent_success = deque(maxlen=self.window)
+
+    def on_episode_end(self, engine, result):
+        self.recent_success.append(result.success)
+        if len(self.recent_success) == self.window and sum(self.recent_success) / self.window >= self.threshold:
+            engine.stop("성공률 도달")
@@ -1,71 +1,178 @@
 # src/env.py
 import numpy as np
 
+# 행동별 (dr, dc) 이동량: 0=up,1=right,2=down,3=left
+ACTION_DELTAS = np.array([(-1, 0), (0, 1), (1, 0), (0, -1)], dtype=np.int64)
+
+def cell_index_map(grid, compact=False):
+    """
+    (n_rows, n_cols) 크기의 칸 → 상태 인덱스 표.
+    compact=False면 r * n_cols + c, compact=True면 빈칸에만 행 우선 순서로 번호를 매기고 벽은 -1.
+    """
+    grid = np.asarray(grid)
+    if not compact:
+        return np.arange(grid.size, dtype=np.int64).reshape(grid.shape)
+    free = grid != 1
+    index = np.full(grid.shape, -1, dtype=np.int64)
+    index[free] = np.arange(np.count_nonzero(free))
+    return index
+
 class GridWorld:
     """
     단순한 Grid 환경.
     0: 빈칸, 1: 장애물, G: 목표(골), S: 시작
     상태는 (row, col) 형태.
     행동: 0=up,1=right,2=down,3=left
+
+    생성 시 모든 (상태, 행동)에 대한 전이표를 한 번 계산해 공개한다.
+      next_state[n_states, 4], reward[n_states, 4], done[n_states, 4]
+    step()은 이 표를 조회하기만 한다.
+
+    compact=True면 벽이 아닌 칸에만 상태 인덱스를 부여해 (cell_index_map 참고)
+    큰 미로에서 Q-table과 전이표의 크기를 줄인다.
     """
-    def __init__(self, grid, start, goal, step_reward=-0.04, goal_reward=1.0, obstacle_reward=-1.0):
+    def __init__(self, grid, start, goal, step_reward=-0.04, goal_reward=1.0, obstacle_reward=-1.0,
+                 compact=False):
         self.grid = np.array(grid)
         self.start = start
         self.goal = goal
-        self.pos = start
         self.n_rows, self.n_cols = self.grid.shape
         self.step_reward = step_reward
         self.goal_reward = goal_reward
         self.obstacle_reward = obstacle_reward
+        self.compact = compact
+        self.cell_index = cell_index_map(self.grid, compact)
+        # 상태 인덱스 → 평탄화된 칸 번호 (r * n_cols + c)
+        self.state_cells = np.flatnonzero(self.cell_index.ravel() >= 0)
+        if compact and (self.cell_index[start] < 0 or self.cell_index[goal] < 0):
+            raise ValueError("start and goal must be free cells")
+        self.start_state = self._state_to_idx(start)
+        self.goal_state = self._state_to_idx(goal)
+        self.next_state, self.reward, self.done = self._build_tables()
+        self.state = self.start_state
+
+    def _build_tables(self):
+        # 상태 수가 int32 범위면 전이표도 int32로 저장해 메모리를 절반으로 줄임
+        index_dtype = np.int32 if self.n_states < 2**31 else np.int64
+        rows, cols = np.divmod(self.state_cells, self.n_cols)
+        nr = rows[:, None] + ACTION_DELTAS[:, 0]
+        nc = cols[:, None] + ACTION_DELTAS[:, 1]
+        in_bounds = (nr >= 0) & (nr < self.n_rows) & (nc >= 0) & (nc < self.n_cols)
+        blocked = ~in_bounds
+        blocked[in_bounds] = self.grid[nr[in_bounds], nc[in_bounds]] == 1
+
+        # 장애물 또는 범위 밖: 벌점, 위치는 변하지 않음
+        next_state = np.arange(self.n_states, dtype=index_dtype)[:, None].repeat(4, axis=1)
+        moved = ~blocked
+        next_state[moved] = self.cell_index[nr[moved], nc[moved]]
+        done = ~blocked & (next_state == self.goal_state)
+        reward = np.where(blocked, self.obstacle_reward,
+                          np.where(done, self.goal_reward, self.step_reward))
+        return next_state, reward, done
+
+    @property
+    def pos(self):
+        return self._idx_to_state(self.state)
+
+    @pos.setter
+    def pos(self, value):
+        self.state = self._state_to_idx(value)
 
     def reset(self):
-        self.pos = self.start
-        return self._state_to_idx(self.pos)
+        self.state = self.start_state
+        return self.state
 
     def _in_bounds(self, r, c):
         return 0 <= r < self.n_rows and 0 <= c < self.n_cols
 
     def _state_to_idx(self, pos):
         r, c = pos
-        return r * self.n_cols + c
+        return int(self.cell_index[r, c])
 
     def _idx_to_state(self, idx):
-        r = idx // self.n_cols
-        c = idx % self.n_cols
+        r, c = divmod(int(self.state_cells[idx]), self.n_cols)
         return (r, c)
 
     def step(self, action):
-        r, c = self.pos
-        if action == 0:
-            nr, nc = r - 1, c
-        elif action == 1:
-            nr, nc = r, c + 1
-        elif action == 2:
-            nr, nc = r + 1, c
-        elif action == 3:
-            nr, nc = r, c - 1
-        else:
+        if not 0 <= action < 4:
             raise ValueError("Invalid action")
-
-        if not self._in_bounds(nr, nc) or self.grid[nr, nc] == 1:
-            # 장애물 또는 범위 밖: 벌점, 위치는 변하지 않음
-            reward = self.obstacle_reward
-            done = False
-            next_state = self._state_to_idx(self.pos)
-        else:
-            self.pos = (nr, nc)
-            if self.pos == self.goal:
-                reward = self.goal_reward
-                done = True
-            else:
-                reward = self.step_reward
-                done = False
-            next_state = self._state_to_idx(self.pos)
+        s = self.state
+        next_state = int(self.next_state[s, action])
+        reward = float(self.reward[s, action])
+        done = bool(self.done[s, action])
+        self.state = next_state
         return next_state, reward, done
 
     @property
     def n_states(self):
-        return self.n_rows * self.n_cols
+        return self.state_cells.size
+
+    @property
+    def free_states(self):
+        """벽이 아닌 상태 마스크 (compact 모드에서는 모두 True)"""
+        return self.grid.ravel()[self.state_cells] != 1
+
+    @property
+    def n_actions(self):
+        return 4
+
+
+class VecGridWorld:
+    """
+    같은 미로를 N개 복제해 한 번에 진행하는 벡터화 환경.
+    상태는 (n_envs,) 크기의 NumPy 배열로 관리하며,
+    GridWorld의 전이표를 그대로 사용하므로 보상과 종료 조건이 동일하다.
+    QLearningAgent.choose_action_batch / learn_batch와 함께 직접 루프를 짤 때 쓰는 독립 유틸리티이며,
+    TrainingEngine과 평가/병렬 학습 경로는 GridWorld를 쓴다.
+    """
+    def __init__(self, grid, start, goal, n_envs, step_reward=-0.04, goal_reward=1.0, obstacle_reward=-1.0,
+                 compact=False):
+        self.model = GridWorld(grid, start, goal, step_reward=step_reward,
+                               goal_reward=goal_reward, obstacle_reward=obstacle_reward,
+                               compact=compact)
+        self.grid = self.model.grid
+        self.start = start
+        self.goal = goal
+        self.n_envs = n_envs
+        self.n_rows, self.n_cols = self.grid.shape
+        self.state = np.full(n_envs, self.model.start_state, dtype=np.int64)
+        self.dones = np.zeros(n_envs, dtype=bool)
+
+    def reset(self, mask=None):
+        """mask가 주어지면 해당 환경만 시작 위치로 되돌린다."""
+        if mask is None:
+            mask = np.ones(self.n_envs, dtype=bool)
+        self.state[mask] = self.model.start_state
+        self.dones[mask] = False
+        return self.states()
+
+    def states(self):
+        return self.state.copy()
+
+    @property
+    def rows(self):
+        return self.model.state_cells[self.state] // self.n_cols
+
+    @property
+    def cols(self):
+        return self.model.state_cells[self.state] % self.n_cols
+
+    def step(self, actions):
+        actions = np.asarray(actions)
+        if actions.shape != (self.n_envs,):
+            raise ValueError("actions must have shape (n_envs,)")
+        if np.any((actions < 0) | (actions >= 4)):
+            raise ValueError("Invalid action")
+
+        s = self.state
+        rewards = self.model.reward[s, actions]
+        self.dones = self.model.done[s, actions]
+        self.state = self.model.next_state[s, actions]
+        return self.states(), rewards, self.dones.copy()
+
+    @property
+    def n_states(self):
+        return self.model.n_states
 
     @property
     def n_actions(self):
@@ -0,0 +1,117 @@
+# src/evaluate.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compare_baseline import RandomAgent
+from engine import HistoryRecorder, TrainingEngine
+from env import GridWorld
+from mazes import default_maze
+from train import make_agent
+
+METHODS = ("baseline", "q")
+METRICS = ("success_rate", "mean_reward", "steps_to_goal")
+METRIC_NAMES = {"success_rate": "성공률", "mean_reward": "평균 보상", "steps_to_goal": "목표까지 스텝"}
+METHOD_NAMES = {"baseline": "무학습(대조군)", "q": "Q-러닝", "qlambda": "Q(λ)", "dyna": "Dyna-Q", "prioritized": "우선순위 Dyna-Q"}
+
+def spawn_seeds(root_seed, n_runs, methods=METHODS):
+    """
+    root_seed의 SeedSequence에서 방법마다 n_runs개의 독립 자식 시드를 만든다.
+    같은 root_seed면 항상 같은 시드가 나오고, 마지막 자식은 부트스트랩용이다.
+    """
+    children = np.random.SeedSequence(root_seed).spawn(len(methods) + 1)
+    seeds = {method: child.spawn(n_runs) for method, child in zip(methods, children)}
+    return seeds, children[-1]
+
+def _evaluate_run(method, index, seed, episodes, max_steps, maze, agent_kwargs):
+    """시드 하나로 학습(또는 무작위 탐색)하고 실행 단위 지표를 돌려준다."""
+    env = GridWorld(*maze)
+    if method == "baseline":
+        agent = RandomAgent(env.n_actions, seed)
+    else:
+        agent = make_agent(method, env.n_states, env.n_actions, seed=seed, **agent_kwargs)
+    history = HistoryRecorder()
+    TrainingEngine(env, agent, max_steps=max_steps, callbacks=[history], profile=False).run(episodes)
+
+    success = np.asarray(history.success, dtype=bool)
+    steps = np.asarray(history.steps)
+    return {
+        "method": method,
+        "run": index,
+        "episodes": len(success),
+        "success_rate": float(success.mean()),
+        "mean_reward": float(np.mean(history.rewards)),
+        # 성공한 에피소드의 평균 스텝 수 (성공이 없으면 NaN)
+        "steps_to_goal": float(steps[success].mean()) if success.any() else np.nan,
+    }
+
+def bootstrap_ci(values, rng, n_boot=10_000, level=0.95):
+    """실행 단위 값들의 평균에 대한 백분위 부트스트랩 신뢰구간 (NaN은 제외)"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan, np.nan
+    idx = rng.integers(values.size, size=(n_boot, values.size))
+    means = values[idx].mean(axis=1)
+    alpha = (1.0 - level) / 2
+    low, high = np.quantile(means, [alpha, 1.0 - alpha])
+    return float(low), float(high)
+
+def aggregate(runs, boot_seed, n_boot=10_000, level=0.95):
+    """방법·지표별 평균, 표준편차, 부트스트랩 신뢰구간 표를 만든다."""
+    import pandas as pd
+
+    rows = []
+    boot_seeds = iter(boot_seed.spawn(len(METRICS) * runs["method"].nunique()))
+    for method, group in runs.groupby("method", sort=False):
+        for metric in METRICS:
+            values = group[metric].to_numpy(dtype=float)
+            valid = values[~np.isnan(values)]
+            low, high = bootstrap_ci(valid, np.random.default_rng(next(boot_seeds)), n_boot, level)
+            rows.append({
+                "method": method,
+                "metric": metric,
+                "n": int(valid.size),
+                "mean": float(valid.mean()) if valid.size else np.nan,
+                "std": float(valid.std(ddof=1)) if valid.size > 1 else 0.0,
+                "ci_low": low,
+                "ci_high": high,
+            })
+    return pd.DataFrame(rows)
+
+def evaluate(results_dir="results", methods=METHODS, n_runs=20, root_seed=0,
+             episodes=300, max_steps=100, maze=None, workers=None,
+             n_boot=10_000, level=0.95, verbose=True, **agent_kwargs):
+    """
+    방법마다 n_runs개 시드를 프로세스 풀에서 실행하고,
+    실행별 결과(eval_runs.csv)와 신뢰구간 요약(eval_summary.csv)을 results_dir에 저장한다.
+    결과는 실행 순서와 무관하게 root_seed만으로 결정된다.
+    """
+    import pandas as pd
+
+    os.makedirs(results_dir, exist_ok=True)
+    maze = maze if maze is not None else default_maze()
+    seeds, boot_seed = spawn_seeds(root_seed, n_runs, methods)
+
+    jobs = [(method, i, seed) for method in methods for i, seed in enumerate(seeds[method])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_evaluate_run, method, i, seed, episodes, max_steps, maze, agent_kwargs)
+                   for method, i, seed in jobs]
+        # 제출 순서대로 모으므로 표의 행 순서도 항상 같다
+        runs = pd.DataFrame([fut.result() for fut in futures])
+
+    summary = aggregate(runs, boot_seed, n_boot, level)
+    summary.insert(2, "level", level)
+    runs.to_csv(os.path.join(results_dir, "eval_runs.csv"), index=False)
+    summary.to_csv(os.path.join(results_dir, "eval_summary.csv"), index=False)
+
+    if verbose:
+        for row in summary.itertuples():
+            print(f"[평가] {METHOD_NAMES.get(row.method, row.method)} {METRIC_NAMES[row.metric]}: "
+                  f"{row.mean:.3f} ± {row.std:.3f} ({row.level:.0%} CI {row.ci_low:.3f}~{row.ci_high:.3f}, n={row.n})")
+        print(f"[완료] 다중 시드 평가 결과가 '{results_dir}/eval_summary.csv'에 저장되었습니다.")
+    return runs, summary
+
+if __name__ == "__main__":
+    evaluate()
@@ -0,0 +1,121 @@
+# src/kernels.py
+import numpy as np
+
+from q_learning import QLearningAgent
+
+# numba가 있으면 에피소드 커널을 기계어로 컴파일하고, 없으면 같은 코드를 파이썬으로 실행
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+_TO_DOUBLE = 1.0 / 9007199254740992.0  # 2**-53
+
+@njit(cache=True)
+def q_episode(Q, next_state, reward, done, start, max_steps, lr, gamma, epsilon,
+              raw, has_uint32, uinteger):
+    """
+    epsilon-greedy Q-러닝 에피소드 하나를 한 함수 안에서 실행한다.
+    난수는 미리 뽑은 PCG64 원시 64비트 값(raw)에서 Generator.random()/integers(4)와
+    똑같은 방식으로 꺼내 쓰므로, 같은 시드면 QLearningAgent + GridWorld 루프와 결과가 비트 단위로 같다.
+      random()    : 64비트 하나 → (x >> 11) * 2**-53
+      integers(4) : 32비트 하나 (64비트를 뽑아 아래 32비트를 쓰고 위 32비트는 다음 호출용으로 보관)
+                    → Lemire 방식으로 (x * 4) >> 32
+    (총 보상, 스텝 수, 성공 여부, 사용한 raw 개수, has_uint32, uinteger)를 돌려준다.
+    """
+    n_actions = Q.shape[1]
+    s = start
+    total_reward = 0.0
+    success = 0
+    steps = 0
+    i = 0
+    for _ in range(max_steps):
+        x = raw[i]
+        i += 1
+        if (x >> np.uint64(11)) * _TO_DOUBLE < epsilon:
+            if has_uint32:
+                u = uinteger
+                has_uint32 = 0
+            else:
+                x = raw[i]
+                i += 1
+                u = x & np.uint64(0xFFFFFFFF)
+                uinteger = x >> np.uint64(32)
+                has_uint32 = 1
+            a = np.int64((u * np.uint64(n_actions)) >> np.uint64(32))
+        else:
+            a = 0
+            for b in range(1, n_actions):
+                if Q[s, b] > Q[s, a]:
+                    a = b
+
+        s_next = next_state[s, a]
+        r = reward[s, a]
+        d = done[s, a]
+        target = r
+        if not d:
+            best = Q[s_next, 0]
+            for b in range(1, n_actions):
+                if Q[s_next, b] > best:
+                    best = Q[s_next, b]
+            target = r + gamma * best
+        Q[s, a] += lr * (target - Q[s, a])
+
+        s = s_next
+        total_reward += r
+        steps += 1
+        if d:
+            success = 1
+            break
+    return total_reward, steps, success, i, has_uint32, uinteger
+
+class FusedQRunner:
+    """
+    TrainingEngine의 backend="fused"용 에피소드 실행기.
+    에피소드마다 에이전트 RNG에서 최대로 필요한 만큼 원시 난수를 미리 꺼내 커널에 넘기고,
+    끝나면 실제로 쓴 개수만큼만 RNG를 전진시켜 기준 루프와 같은 RNG 상태를 맞춘다.
+    여러 에피소드를 한 커널에 묶지 않는 것은 의도된 것으로, 콜백(조기 종료, 체크포인트, 기록)이 에피소드마다 돌고
+    어느 에피소드에서 멈춰도 기준 루프와 같은 Q/RNG 상태가 남아야 하기 때문이다. (에피소드당 파이썬 고정 비용은 남음)
+    """
+    def __init__(self, env, agent):
+        if type(agent) is not QLearningAgent:
+            raise ValueError("fused backend supports only QLearningAgent")
+        if agent.Q.dtype != np.float64:
+            raise ValueError("fused backend requires a float64 Q-table")
+        if not isinstance(agent.rng.bit_generator, np.random.PCG64):
+            raise ValueError("fused backend requires a PCG64 generator")
+        # 커널의 Lemire 방식에는 거절 단계가 없어, 거절이 일어나지 않는 2의 거듭제곱일 때만 integers()와 같다
+        # (행동이 하나면 numpy는 난수를 뽑지 않음)
+        n = agent.n_actions
+        if n < 2 or n > 2**32 or n & (n - 1):
+            raise ValueError(f"fused backend requires a power-of-two number of actions (got {n})")
+        self.env = env
+        self.agent = agent
+        self.reward = np.ascontiguousarray(env.reward, dtype=np.float64)
+        self.next_state = np.ascontiguousarray(env.next_state)
+        self.done = np.ascontiguousarray(env.done)
+
+    def run_episode(self, max_steps):
+        agent = self.agent
+        bg = agent.rng.bit_generator
+        state = bg.state
+        # 스텝마다 random() 하나 + integers() 최대 64비트 하나
+        raw = bg.random_raw(2 * max_steps)
+        total_reward, steps, success, used, has_uint32, uinteger = q_episode(
+            agent.Q, self.next_state, self.reward, self.done, self.env.start_state,
+            max_steps, agent.lr, agent.gamma, agent.epsilon,
+            raw, state["has_uint32"], np.uint64(state["uinteger"]))
+
+        bg.state = state
+        bg.advance(used)
+        state = bg.state
+        state["has_uint32"] = int(has_uint32)
+        state["uinteger"] = int(uinteger)
+        bg.state = state
+        return float(total_reward), int(steps), int(success)
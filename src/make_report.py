@@ -1,12 +1,6 @@
 # src/make_report.py
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.lib import colors
-from reportlab.lib.units import cm
 import os
+import csv
 
 def parse_summary(path):
     data = {}
@@ -18,7 +12,32 @@ def parse_summary(path):
                     data[k.strip()] = v.strip()
     return data
 
+def parse_eval_summary(path):
+    """evaluate.py가 만든 eval_summary.csv를 {(방법, 지표): 행} 으로 읽는다."""
+    rows = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                rows[(row["method"], row["metric"])] = row
+    return rows
+
+def format_ci(row):
+    """평균 ± 표준편차 [신뢰구간]"""
+    if row is None or row["mean"] in ("", "nan"):
+        return "-"
+    return (f"{float(row['mean']):.3f} ± {float(row['std']):.3f}<br/>"
+            f"[{float(row['ci_low']):.3f}, {float(row['ci_high']):.3f}]")
+
 def make_report(result_dir="results"):
+    # reportlab은 보고서를 만들 때만 필요
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+
     pdf_path = os.path.join(result_dir, "결과_비교_보고서.pdf")
 
     # ✅ 한글 폰트 등록
@@ -63,6 +82,17 @@ def make_report(result_dir="results"):
             story.append(Paragraph(comment, style_body))
             story.append(Spacer(1, 0.5*cm))
 
+    # ---- 전체 상태 탐욕 정책 분석 ----
+    rollout_path = os.path.join(result_dir, "rollout_map.png")
+    if os.path.exists(rollout_path):
+        story.append(Paragraph("🗺️ 전체 칸 탐욕 정책 분석", style_sub))
+        story.append(Image(rollout_path, width=10*cm, height=8*cm))
+        story.append(Spacer(1, 0.3*cm))
+        story.append(Paragraph(
+            "모든 빈칸에서 학습된 탐욕 정책을 따라갔을 때 목표까지 걸리는 스텝 수를 색으로 나타냈습니다. "
+            "빨간 칸은 순환에 빠지는 칸, 주황 칸은 벽에 막혀 멈추는 칸입니다.", style_body))
+        story.append(Spacer(1, 0.5*cm))
+
     # ---- 실험 결과 요약 비교 ----
     story.append(Paragraph("📄 실험 결과 요약 비교", style_sub))
     base_data = parse_summary(os.path.join(result_dir, "baseline_summary.txt"))
@@ -74,7 +104,10 @@ def make_report(result_dir="results"):
         table_data = [
             [p("지표"), p("무학습(대조군)"), p("Q-러닝(학습군)")]
         ]
-        keys = ["총 에피소드", "성공 횟수", "성공률", "평균 보상"]
+        keys = ["총 에피소드", "성공 횟수", "성공률", "평균 보상", "정책 커버리지", "시작점 경로 길이"]
+        if "성공 횟수" not in base_data and "기대 성공 횟수" in base_data:
+            # 정확 계산(analytic) 대조군은 성공 횟수의 기댓값만 있음
+            base_data["성공 횟수"] = f"{base_data['기대 성공 횟수']} (기댓값)"
         for key in keys:
             table_data.append([
                 p(key),
@@ -94,6 +127,31 @@ def make_report(result_dir="results"):
     else:
         story.append(Paragraph("⚠️ 요약 데이터 파일을 찾을 수 없습니다.", style_body))
 
+    # ---- 다중 시드 평가 (evaluate.py) ----
+    eval_data = parse_eval_summary(os.path.join(result_dir, "eval_summary.csv"))
+    if eval_data:
+        def p(text): return Paragraph(text, style_table)
+        methods = list(dict.fromkeys(method for method, _ in eval_data))
+        any_row = next(iter(eval_data.values()))
+        story.append(Paragraph("📈 다중 시드 평가 (평균 ± 표준편차 [신뢰구간])", style_sub))
+        story.append(Paragraph(
+            f"방법마다 {any_row['n']}개의 독립 시드로 반복 실행한 결과이며, "
+            f"괄호 안은 {float(any_row['level']):.0%} 부트스트랩 신뢰구간입니다.", style_body))
+        from evaluate import METHOD_NAMES, METRIC_NAMES
+        table_data = [[p("지표")] + [p(METHOD_NAMES.get(m, m)) for m in methods]]
+        for metric, name in METRIC_NAMES.items():
+            table_data.append([p(name)] + [p(format_ci(eval_data.get((m, metric)))) for m in methods])
+
+        t = Table(table_data, colWidths=[4*cm] + [10*cm / len(methods)] * len(methods))
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
+            ('GRID', (0,0), (-1,-1), 0.5, colors.black),
+            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+            ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+        ]))
+        story.append(t)
+        story.append(Spacer(1, 0.5*cm))
+
     # ---- 결론 ----
     story.append(Paragraph("✅ 결론", style_sub))
     story.append(Paragraph(
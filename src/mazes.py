@@ -0,0 +1,128 @@
+# src/mazes.py
+import itertools
+import numpy as np
+
+# 네 방향의 모든 순서 (칸마다 하나를 골라 탐색 순서로 사용)
+_DIR_ORDERS = list(itertools.permutations(range(4)))
+
+def default_maze():
+    grid = [
+        [0,0,0,0,0],
+        [0,1,1,1,0],
+        [0,0,0,1,0],
+        [0,1,0,0,0],
+        [0,0,0,1,0],
+    ]
+    start = (0,0)
+    goal = (4,4)
+    return grid, start, goal
+
+def _carve_passages(h, w, rng):
+    """h×w 칸 격자에서 무작위 깊이 우선 탐색으로 신장 트리의 간선 목록을 만든다."""
+    n = h * w
+    visited = bytearray(n)
+    next_dir = bytearray(n)
+    order = rng.integers(len(_DIR_ORDERS), size=n)
+    edges = []
+    stack = [0]
+    visited[0] = 1
+    while stack:
+        cur = stack[-1]
+        r, c = divmod(cur, w)
+        dirs = _DIR_ORDERS[order[cur]]
+        k = next_dir[cur]
+        moved = False
+        while k < 4:
+            d = dirs[k]
+            k += 1
+            if d == 0:
+                if r == 0:
+                    continue
+                nb = cur - w
+            elif d == 1:
+                if c == w - 1:
+                    continue
+                nb = cur + 1
+            elif d == 2:
+                if r == h - 1:
+                    continue
+                nb = cur + w
+            else:
+                if c == 0:
+                    continue
+                nb = cur - 1
+            if not visited[nb]:
+                visited[nb] = 1
+                edges.append((cur, nb))
+                stack.append(nb)
+                moved = True
+                break
+        next_dir[cur] = k
+        if not moved:
+            stack.pop()
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+def _braid(grid, braid, rng):
+    """막다른 칸 중 braid 비율만큼 벽 하나를 허물어 순환 경로를 만든다."""
+    n_rows, n_cols = grid.shape
+    cells = np.zeros_like(grid, dtype=bool)
+    cells[0::2, 0::2] = True
+    cells &= grid == 0
+
+    padded = np.pad(grid, 1, constant_values=1)
+    # 방향별 (이웃 벽 칸, 건너편 칸) 오프셋: up, right, down, left
+    offsets = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+    open_count = sum((padded[1 + dr:1 + dr + n_rows, 1 + dc:1 + dc + n_cols] == 0).astype(int)
+                     for dr, dc in offsets)
+    dead_r, dead_c = np.nonzero(cells & (open_count == 1))
+    pick = rng.random(dead_r.size) < braid
+    dead_r, dead_c = dead_r[pick], dead_c[pick]
+    if dead_r.size == 0:
+        return grid
+
+    # 허물 수 있는 벽(건너편에 칸이 있는 닫힌 벽) 중 하나를 무작위로 선택
+    candidates = np.zeros((dead_r.size, 4), dtype=bool)
+    for k, (dr, dc) in enumerate(offsets):
+        wr, wc = dead_r + dr, dead_c + dc
+        fr, fc = dead_r + 2 * dr, dead_c + 2 * dc
+        ok = (fr >= 0) & (fr < n_rows) & (fc >= 0) & (fc < n_cols)
+        ok[ok] &= grid[wr[ok], wc[ok]] == 1
+        candidates[:, k] = ok
+    scores = np.where(candidates, rng.random(candidates.shape), -1.0)
+    choice = np.argmax(scores, axis=1)
+    valid = candidates.any(axis=1)
+    delta = np.array(offsets)[choice[valid]]
+    grid[dead_r[valid] + delta[:, 0], dead_c[valid] + delta[:, 1]] = 0
+    return grid
+
+def generate_maze(n_rows, n_cols, seed=None, braid=0.0):
+    """
+    n_rows×n_cols 크기의 미로를 만든다. (0: 빈칸, 1: 벽)
+    짝수 좌표가 칸, 그 사이가 벽이며 braid=0이면 모든 칸 사이 경로가 하나뿐인 완전 미로,
+    braid>0이면 막다른 길의 해당 비율을 뚫어 순환이 있는 미로가 된다.
+    같은 seed면 항상 같은 미로를 돌려준다.
+    """
+    rng = np.random.default_rng(seed)
+    h, w = (n_rows + 1) // 2, (n_cols + 1) // 2
+    grid = np.ones((n_rows, n_cols), dtype=np.uint8)
+    grid[0::2, 0::2] = 0
+
+    edges = _carve_passages(h, w, rng)
+    (ra, ca), (rb, cb) = np.divmod(edges[:, 0], w), np.divmod(edges[:, 1], w)
+    grid[ra + rb, ca + cb] = 0
+
+    if braid > 0:
+        grid = _braid(grid, braid, rng)
+
+    start = (0, 0)
+    goal = (2 * (h - 1), 2 * (w - 1))
+    return grid, start, goal
+
+def upscale_maze(maze, factor):
+    """
+    미로의 칸 하나를 factor×factor 블록으로 늘린다. (통로 폭이 factor인 큰 미로)
+    시작점과 목표는 해당 블록의 왼쪽 위 칸이다.
+    """
+    grid, start, goal = maze
+    grid = np.kron(np.asarray(grid, dtype=np.uint8), np.ones((factor, factor), dtype=np.uint8))
+    return grid, (start[0] * factor, start[1] * factor), (goal[0] * factor, goal[1] * factor)
@@ -0,0 +1,174 @@
+# src/metrics.py
+import os
+from collections import deque
+from time import perf_counter
+
+import numpy as np
+
+from engine import Callback
+
+# 에피소드 하나당 고정 길이 레코드 (헤더 없이 이어 붙인 원본 바이트)
+METRIC_DTYPE = np.dtype([
+    ("episode", "<u4"),
+    ("steps", "<u4"),
+    ("success", "u1"),
+    ("reward", "<f8"),
+    ("epsilon", "<f4"),
+    ("wall_time", "<f8"),
+])
+
+def read_metrics(path):
+    """로그 전체를 읽기 전용 memmap 구조 배열로 연다. (비어 있으면 길이 0 배열)"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=METRIC_DTYPE)
+    return np.memmap(path, dtype=METRIC_DTYPE, mode="r")
+
+def iter_chunks(path, chunk_size=1_000_000):
+    """로그를 chunk_size 레코드씩 나눠 돌려준다. (메모리 사용량은 청크 크기로 제한)"""
+    records = read_metrics(path)
+    for i in range(0, len(records), chunk_size):
+        yield records[i:i + chunk_size]
+
+class RollingStats:
+    """최근 window 에피소드의 보상/성공률과 전체 누적값만 유지한다."""
+    def __init__(self, window=100):
+        self.rewards = deque(maxlen=window)
+        self.success = deque(maxlen=window)
+        self.reward_sum = 0.0
+        self.success_sum = 0
+        self.episodes = 0
+        self.total_success = 0
+        self.total_reward = 0.0
+
+    def update(self, reward, success):
+        if len(self.rewards) == self.rewards.maxlen:
+            self.reward_sum -= self.rewards[0]
+            self.success_sum -= self.success[0]
+        self.rewards.append(reward)
+        self.success.append(success)
+        self.reward_sum += reward
+        self.success_sum += success
+        self.episodes += 1
+        self.total_success += success
+        self.total_reward += reward
+
+    @property
+    def rolling_reward(self):
+        return self.reward_sum / max(len(self.rewards), 1)
+
+    @property
+    def rolling_success(self):
+        return self.success_sum / max(len(self.success), 1)
+
+class MetricsWriter(Callback):
+    """
+    에피소드 기록을 chunk_size개씩 모아 path에 이어 쓰는 콜백.
+    메모리에는 청크 버퍼와 RollingStats만 두므로 에피소드 수가 늘어도 사용량이 일정하다.
+    resume_episode가 주어지면 기존 로그에서 그 이후 기록을 잘라내고 이어서 쓴다.
+    """
+    def __init__(self, path, chunk_size=4096, window=100, resume_episode=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.stats = RollingStats(window)
+        self._buffer = np.zeros(chunk_size, dtype=METRIC_DTYPE)
+        self._n = 0
+
+        if resume_episode is None or not os.path.exists(path):
+            open(path, "wb").close()
+        else:
+            keep = int(np.searchsorted(read_metrics(path)["episode"], resume_episode))
+            with open(path, "r+b") as f:
+                f.truncate(keep * METRIC_DTYPE.itemsize)
+        self.start_index = os.path.getsize(path) // METRIC_DTYPE.itemsize
+
+    def on_train_start(self, engine):
+        self._t0 = perf_counter()
+
+    def on_episode_end(self, engine, result):
+        rec = self._buffer[self._n]
+        rec["episode"] = result.episode
+        rec["steps"] = result.steps
+        rec["success"] = result.success
+        rec["reward"] = result.reward
+        rec["epsilon"] = result.epsilon
+        rec["wall_time"] = perf_counter() - self._t0
+        self._n += 1
+        self.stats.update(result.reward, result.success)
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def on_checkpoint(self, engine, episode):
+        self.flush()
+
+    def on_train_end(self, engine):
+        self.flush()
+
+    def flush(self):
+        if self._n:
+            with open(self.path, "ab") as f:
+                f.write(self._buffer[:self._n].tobytes())
+            self._n = 0
+
+def summarize(path, window=100, threshold=0.9, chunk_size=1_000_000):
+    """
+    로그를 한 번 훑으며 요약값을 계산한다.
+    (에피소드 수, 성공 횟수, 평균 보상, 환경 스텝 합계, 최근 window 성공률, 수렴 에피소드)
+    수렴 에피소드는 최근 window 에피소드 성공률이 처음으로 threshold 이상이 된 에피소드 번호이며,
+    청크 경계에서는 앞 청크의 마지막 window-1개만 이어 붙여 계산한다.
+    """
+    episodes = 0
+    total_success = 0
+    reward_sum = 0.0
+    total_steps = 0
+    conv_ep = None
+    carry = np.zeros(0)
+    tail = np.zeros(0)
+    for chunk in iter_chunks(path, chunk_size):
+        success = chunk["success"].astype(float)
+        if conv_ep is None:
+            joined = np.concatenate([carry, success])
+            if joined.size >= window:
+                rolling = np.convolve(joined, np.ones(window) / window, mode="valid")
+                hit = np.flatnonzero(rolling >= threshold)
+                if hit.size:
+                    conv_ep = episodes - carry.size + int(hit[0]) + window
+            carry = joined[-(window - 1):] if window > 1 else np.zeros(0)
+        tail = np.concatenate([tail, success])[-window:]
+        episodes += chunk.size
+        total_success += int(chunk["success"].sum())
+        reward_sum += float(chunk["reward"].sum())
+        total_steps += int(chunk["steps"].sum(dtype=np.int64))
+    return {
+        "episodes": episodes,
+        "success": total_success,
+        "mean_reward": reward_sum / max(episodes, 1),
+        "total_steps": total_steps,
+        "final_success_rate": float(tail.mean()) if tail.size else 0.0,
+        "convergence_episode": conv_ep,
+    }
+
+def downsample_curves(path, max_points=2000, chunk_size=1_000_000):
+    """
+    그래프용 (에피소드 번호, 구간 평균 보상, 누적 성공률)을 최대 max_points개 점으로 만든다.
+    로그를 청크 단위로 한 번만 훑는다.
+    """
+    n = len(read_metrics(path))
+    bucket = max(1, -(-n // max_points))
+    n_buckets = -(-n // bucket)
+    reward_sum = np.zeros(n_buckets)
+    counts = np.zeros(n_buckets)
+    cum_success = np.zeros(n_buckets)
+    offset = 0
+    success_so_far = 0
+    for chunk in iter_chunks(path, chunk_size):
+        idx = (offset + np.arange(chunk.size)) // bucket
+        np.add.at(reward_sum, idx, chunk["reward"])
+        np.add.at(counts, idx, 1)
+        cum = success_so_far + np.cumsum(chunk["success"], dtype=np.int64)
+        # 각 구간의 마지막 에피소드 시점 누적 성공률
+        ends = np.flatnonzero(np.r_[idx[1:] != idx[:-1], True])
+        cum_success[idx[ends]] = cum[ends] / (offset + ends + 1)
+        success_so_far = int(cum[-1])
+        offset += chunk.size
+    x = np.minimum((np.arange(n_buckets) + 1) * bucket, n)
+    return x, reward_sum / np.maximum(counts, 1), cum_success
@@ -0,0 +1,224 @@
+# src/parallel.py
+import queue
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from time import monotonic
+
+import numpy as np
+
+from engine import Callback, EpisodeResult, TrainingEngine
+
+# 작업 프로세스가 한 번에 가져가는 에피소드 수 (공유 카운터 잠금 횟수를 줄임)
+CLAIM_SIZE = 16
+
+class SharedQ:
+    """multiprocessing.shared_memory 위에 올린 Q 배열. 부모가 만들고(create=True) 작업 프로세스는 이름으로 붙는다."""
+    def __init__(self, shape, dtype=np.float64, name=None, create=False):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        del self.array
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+def _striped_learn(agent, locks):
+    """agent.learn을 갱신하는 행(s) 번호로 고른 잠금 안에서 실행하도록 감싼다."""
+    learn = agent.learn
+    n = len(locks)
+
+    def locked_learn(s, a, r, s_next, done):
+        with locks[s % n]:
+            return learn(s, a, r, s_next, done)
+    agent.learn = locked_learn
+
+class _QueueSink(Callback):
+    """작업 프로세스 쪽 콜백: 에피소드 결과를 모아 두었다가 한 묶음씩 부모에게 보낸다."""
+    def __init__(self, worker_id, results):
+        self.worker_id = worker_id
+        self.results = results
+        self.batch = []
+
+    def on_episode_end(self, engine, result):
+        self.batch.append((result.reward, result.steps, result.success, result.epsilon))
+
+    def flush(self):
+        if self.batch:
+            self.results.put(("episodes", self.worker_id, self.batch))
+            self.batch = []
+
+def _worker(worker_id, spec, shm_name, shape, dtype, seed, schedule, counter, episodes,
+            stop_flag, locks, results):
+    """공유 Q를 붙여 에피소드를 가져갈 수 있는 동안 학습한다."""
+    from env import GridWorld
+    from train import make_agent
+
+    shared = SharedQ(shape, dtype, name=shm_name)
+    agent = None
+    try:
+        env = GridWorld(*spec["maze"], compact=spec["compact"])
+        agent = make_agent(spec["agent_type"], env.n_states, env.n_actions, seed=seed, dtype=dtype,
+                           **{**spec["agent_kwargs"], **schedule})
+        agent.Q = shared.array
+        if locks:
+            _striped_learn(agent, locks)
+        sink = _QueueSink(worker_id, results)
+        engine = TrainingEngine(env, agent, max_steps=spec["max_steps"], callbacks=[sink],
+                                profile=False, backend=spec["backend"])
+        done_here = 0
+        while not stop_flag.value:
+            with counter.get_lock():
+                claim = min(CLAIM_SIZE, episodes - counter.value)
+                counter.value += max(claim, 0)
+            if claim <= 0:
+                break
+            engine.run(done_here + claim, start_episode=done_here)
+            done_here += claim
+            sink.flush()
+        results.put(("done", worker_id, None))
+    except BaseException as e:
+        results.put(("error", worker_id, repr(e)))
+        raise
+    finally:
+        # 공유 버퍼를 가리키는 배열이 남아 있으면 close()가 실패하므로 먼저 끊음
+        if agent is not None:
+            agent.Q = None
+        engine = None
+        shared.close()
+
+class ParallelTrainer:
+    """
+    여러 프로세스가 각자 GridWorld 에피소드를 돌리며 공유 메모리의 Q 하나를 갱신하는 학습기.
+    lock_stripes=0이면 잠금 없이(Hogwild 방식), N이면 행 번호 % N으로 고른 잠금 안에서 갱신한다.
+    (잠금 모드는 backend="python", agent_type="q"만 가능. Dyna 계획 업데이트와 Q(λ) 흔적 갱신은
+    현재 상태 행 밖을 잠금 없이 쓰므로 받지 않음)
+
+    작업 프로세스마다 SeedSequence로 나눈 시드와 자기 epsilon 스케줄(schedules)을 가진다.
+    끝난 에피소드는 도착 순서대로 전역 에피소드 번호를 붙여 부모 프로세스의 콜백에 전달하므로
+    MetricsWriter, CheckpointWriter, SuccessStopping 등 TrainingEngine용 콜백을 그대로 쓸 수 있다.
+    (on_step 콜백은 지원하지 않음) 콜백에서 stop()을 부르면 작업 프로세스가 현재 묶음을 마치고 멈춘다.
+
+    학습 중 agent.Q는 공유 배열을 가리키고, 끝나면 일반 배열 사본으로 바뀐다.
+    """
+    def __init__(self, env, agent, maze, agent_type="q", agent_kwargs=None, workers=2,
+                 max_steps=100, callbacks=(), checkpoint_every=None, lock_stripes=0,
+                 seed=None, schedules=None, backend="python"):
+        if any(type(cb).on_step is not Callback.on_step for cb in callbacks):
+            raise ValueError("on_step callbacks are not supported by parallel training")
+        if lock_stripes and backend != "python":
+            raise ValueError("striped locks require backend='python'")
+        if lock_stripes and agent_type != "q":
+            raise ValueError(f"striped locks only cover the updated state's row; "
+                             f"agent_type={agent_type!r} writes other rows (use lock_stripes=0)")
+        self.env = env
+        self.agent = agent
+        self.maze = maze
+        self.agent_type = agent_type
+        self.agent_kwargs = dict(agent_kwargs or {})
+        self.workers = workers
+        self.max_steps = max_steps
+        self.callbacks = list(callbacks)
+        self.checkpoint_every = checkpoint_every
+        self.lock_stripes = lock_stripes
+        self.seeds = np.random.SeedSequence(seed).spawn(workers)
+        default = {"epsilon": agent.epsilon}
+        self.schedules = [{**default, **s} for s in (schedules or [{}] * workers)]
+        if len(self.schedules) != workers:
+            raise ValueError("schedules must have one entry per worker")
+        self.backend = backend
+        self.total_steps = 0
+        self.episodes_run = 0
+        self.stop_reason = None
+        self.wall_time = 0.0
+
+    def stop(self, reason):
+        self.stop_reason = reason
+
+    def run(self, episodes, start_episode=0):
+        """start_episode부터 episodes 직전까지 전체 작업 프로세스가 나눠 학습한다."""
+        ctx = mp.get_context()
+        agent = self.agent
+        shared = SharedQ(agent.Q.shape, agent.Q.dtype, create=True)
+        shared.array[:] = agent.Q
+        agent.Q = shared.array
+
+        counter = ctx.Value("q", start_episode)
+        stop_flag = ctx.Value("b", 0)
+        locks = [ctx.Lock() for _ in range(self.lock_stripes)]
+        results = ctx.Queue()
+        spec = {"maze": self.maze, "compact": self.env.compact, "agent_type": self.agent_type,
+                "agent_kwargs": self.agent_kwargs, "max_steps": self.max_steps, "backend": self.backend}
+        procs = [ctx.Process(target=_worker, daemon=True,
+                             args=(i, spec, shared.name, agent.Q.shape, agent.Q.dtype, self.seeds[i],
+                                   self.schedules[i], counter, episodes, stop_flag, locks, results))
+                 for i in range(self.workers)]
+
+        self.stop_reason = None
+        ep = start_episode
+        t0 = monotonic()
+        try:
+            for cb in self.callbacks:
+                cb.on_train_start(self)
+            for p in procs:
+                p.start()
+            running = self.workers
+            while running:
+                try:
+                    kind, worker_id, payload = results.get(timeout=1.0)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in procs):
+                        raise RuntimeError("parallel workers exited unexpectedly")
+                    continue
+                if kind == "error":
+                    raise RuntimeError(f"worker {worker_id} failed: {payload}")
+                if kind == "done":
+                    running -= 1
+                    continue
+                for reward, steps, success, epsilon in payload:
+                    if self.stop_reason is not None:
+                        break  # 종료 요청 뒤에 도착한 에피소드는 버림
+                    ep = self._dispatch(ep, reward, steps, success, epsilon)
+                if self.stop_reason is not None:
+                    stop_flag.value = 1
+            for cb in self.callbacks:
+                cb.on_train_end(self)
+        finally:
+            stop_flag.value = 1
+            for p in procs:
+                p.join(timeout=10)
+                if p.is_alive():
+                    p.terminate()
+            self.wall_time = monotonic() - t0
+            agent.Q = shared.array.copy()
+            shared.close()
+            shared.unlink()
+        return self.episodes_run
+
+    def _dispatch(self, ep, reward, steps, success, epsilon):
+        """작업 프로세스에서 온 에피소드 하나를 전역 번호로 콜백에 넘긴다."""
+        self.agent.epsilon = epsilon
+        result = EpisodeResult(ep, reward, steps, success, epsilon)
+        for cb in self.callbacks:
+            cb.on_episode_start(self, ep)
+        for cb in self.callbacks:
+            cb.on_episode_end(self, result)
+        self.episodes_run += 1
+        self.total_steps += steps
+        if self.checkpoint_every is not None and (ep + 1) % self.checkpoint_every == 0:
+            for cb in self.callbacks:
+                cb.on_checkpoint(self, ep + 1)
+        return ep + 1
+
+    def timing_report(self):
+        rate = self.episodes_run / self.wall_time if self.wall_time else 0.0
+        mode = f"잠금 {self.lock_stripes}개" if self.lock_stripes else "Hogwild"
+        return f"작업 프로세스 {self.workers}개 ({mode}) | {self.wall_time:.3f}s | {rate:,.0f} episodes/s"
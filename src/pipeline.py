@@ -0,0 +1,201 @@
+# src/pipeline.py
+import os
+import ast
+import copy
+import json
+import shutil
+import hashlib
+import tempfile
+from time import perf_counter
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 단계별 설정. evaluate를 None으로 두면 다중 시드 평가 단계를 건너뛴다.
+DEFAULT_CONFIG = {
+    "maze": {"size": 0, "seed": 0, "braid": 0.0},   # size=0이면 기본 5×5 미로
+    "plots": True,
+    "baseline": {"episodes": 300, "max_steps": 100, "seed": 0, "mode": "simulate"},
+    "train": {"episodes": 2000, "max_steps": 100, "seed": 0, "lr": 0.1, "gamma": 0.99,
+              "decay": 0.995, "agent_type": "q", "backend": "python"},
+    "evaluate": {"n_runs": 20, "episodes": 300, "max_steps": 100, "root_seed": 0},
+}
+
+# (단계 이름, 코드 버전을 정하는 시작 모듈, 앞 단계)
+STAGES = [
+    ("baseline", "compare_baseline", ()),
+    ("train", "train", ()),
+    ("evaluate", "evaluate", ()),
+    ("visualize", "visualize", ("train",)),
+    ("report", "make_report", ("baseline", "train", "evaluate", "visualize")),
+]
+
+def _local_imports(module):
+    """module.py가 (함수 안 지연 import 포함) 불러오는 src/ 안의 모듈 이름들"""
+    with open(os.path.join(SRC_DIR, module + ".py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module.split(".")[0])
+    return {name for name in names if os.path.exists(os.path.join(SRC_DIR, name + ".py"))}
+
+def code_version(module):
+    """module과 그 모듈이 의존하는 src/ 모듈 전체의 소스 해시"""
+    seen, stack = set(), [module]
+    while stack:
+        name = stack.pop()
+        if name not in seen:
+            seen.add(name)
+            stack.extend(_local_imports(name) - seen)
+    h = hashlib.sha256()
+    for name in sorted(seen):
+        with open(os.path.join(SRC_DIR, name + ".py"), "rb") as f:
+            h.update(name.encode("utf-8") + b"\0" + f.read())
+    return h.hexdigest()
+
+def make_maze(spec):
+    from mazes import default_maze, generate_maze
+    if not spec.get("size"):
+        return default_maze()
+    return generate_maze(spec["size"], spec["size"], seed=spec.get("seed"), braid=spec.get("braid", 0.0))
+
+def _maze_digest(maze):
+    grid, start, goal = maze
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    h = hashlib.sha256(repr((grid.shape, tuple(start), tuple(goal))).encode("utf-8"))
+    h.update(grid.tobytes())
+    return h.hexdigest()
+
+def stage_key(name, params, maze_digest, upstream_keys, code):
+    payload = json.dumps({"stage": name, "params": params, "maze": maze_digest,
+                          "upstream": upstream_keys, "code": code}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# --- 단계 실행 함수: (작업 디렉터리, 설정, 미로, 앞 단계 결과 디렉터리) ---
+
+def _run_baseline(work_dir, config, maze, upstream):
+    from compare_baseline import random_baseline
+    random_baseline(results_dir=work_dir, maze=maze, save_plots=config["plots"], verbose=False,
+                    **config["baseline"])
+
+def _run_train(work_dir, config, maze, upstream):
+    from train import train_and_save
+    train_and_save(results_dir=work_dir, maze=maze, save_plots=config["plots"], verbose=False,
+                   **config["train"])
+
+def _run_evaluate(work_dir, config, maze, upstream):
+    from evaluate import evaluate
+    evaluate(results_dir=work_dir, maze=maze, verbose=False, **config["evaluate"])
+
+def _run_visualize(work_dir, config, maze, upstream):
+    from visualize import visualize_results
+    visualize_results(results_dir=work_dir, maze=maze,
+                      q_path=os.path.join(upstream["train"], "q_table.qckpt"))
+
+def _run_report(work_dir, config, maze, upstream):
+    from make_report import make_report
+    # 보고서는 한 폴더의 산출물을 읽으므로 앞 단계 결과를 모아 놓고 만든 뒤 PDF만 남김
+    for stage_dir in upstream.values():
+        _link_tree(stage_dir, work_dir)
+    make_report(result_dir=work_dir)
+    for entry in os.listdir(work_dir):
+        if not entry.endswith(".pdf") and entry != MANIFEST:
+            os.remove(os.path.join(work_dir, entry))
+
+RUNNERS = {"baseline": _run_baseline, "train": _run_train, "evaluate": _run_evaluate,
+           "visualize": _run_visualize, "report": _run_report}
+
+MANIFEST = "stage.json"
+
+def _link_tree(src_dir, dst_dir):
+    """src_dir의 파일들을 dst_dir에 하드 링크(안 되면 복사)로 둔다. 숨김 항목과 매니페스트는 제외."""
+    os.makedirs(dst_dir, exist_ok=True)
+    for entry in os.listdir(src_dir):
+        src = os.path.join(src_dir, entry)
+        if entry.startswith(".") or entry == MANIFEST or not os.path.isfile(src):
+            continue
+        dst = os.path.join(dst_dir, entry)
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+def _stage_params(name, config):
+    if name in ("baseline", "train", "evaluate"):
+        return {"plots": config["plots"], **config[name]}
+    return {"plots": config["plots"]}
+
+def run_pipeline(config=None, cache_dir=".cache/pipeline", out_dir=None, force=(), verbose=True):
+    """
+    baseline → train → (evaluate) → visualize → report 단계를 내용 주소 캐시로 실행한다.
+
+    각 단계의 키는 (설정, 미로 내용, 앞 단계 키, 단계가 쓰는 src/ 모듈들의 소스 해시)의 SHA-256이고,
+    산출물은 cache_dir/<단계>/<키>/에 저장된다. 같은 키의 결과가 이미 있으면 그 단계는 건너뛰므로
+    보고서 코드만 고쳤다면 보고서만, 그래프 코드만 고쳤다면 visualize와 report만 다시 만든다.
+    설정이 다른 실행의 산출물은 키가 달라 서로 덮어쓰지 않는다.
+    (seed가 None이면 같은 키라도 결과가 달라질 수 있으니 캐시하려면 seed를 고정할 것)
+
+    모든 단계 산출물은 out_dir(기본 results/pipeline/<보고서 키 앞 12자리>)에 하드 링크로 모은다.
+    force에 단계 이름을 넣으면 캐시가 있어도 다시 실행한다. {단계: 캐시 디렉터리}를 돌려준다.
+    """
+    config = _merge(DEFAULT_CONFIG, config or {})
+    maze = make_maze(config["maze"])
+    digest = _maze_digest(maze)
+
+    keys, dirs = {}, {}
+    for name, module, deps in STAGES:
+        if name == "evaluate" and config["evaluate"] is None:
+            continue
+        upstream = {dep: dirs[dep] for dep in deps if dep in dirs}
+        params = _stage_params(name, config)
+        key = stage_key(name, params, digest, {dep: keys[dep] for dep in upstream}, code_version(module))
+        stage_dir = os.path.join(cache_dir, name, key[:16])
+        keys[name], dirs[name] = key, stage_dir
+
+        if os.path.exists(os.path.join(stage_dir, MANIFEST)) and name not in force:
+            if verbose:
+                print(f"[파이프라인] {name:9s} 캐시 사용 ({key[:12]})")
+            continue
+
+        # 중간에 실패해도 캐시에 반쯤 만든 결과가 남지 않도록 임시 디렉터리에서 만든 뒤 교체
+        os.makedirs(os.path.dirname(stage_dir), exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=f".{key[:16]}-", dir=os.path.dirname(stage_dir))
+        t0 = perf_counter()
+        try:
+            RUNNERS[name](work_dir, config, maze, upstream)
+            with open(os.path.join(work_dir, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump({"stage": name, "key": key, "params": params, "upstream": upstream,
+                           "maze": digest, "seconds": perf_counter() - t0}, f, indent=2, default=str)
+            if os.path.exists(stage_dir):
+                shutil.rmtree(stage_dir)
+            os.replace(work_dir, stage_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        if verbose:
+            print(f"[파이프라인] {name:9s} 실행 {perf_counter() - t0:.1f}s ({key[:12]})")
+
+    out_dir = out_dir or os.path.join("results", "pipeline", keys["report"][:12])
+    for stage_dir in dirs.values():
+        _link_tree(stage_dir, out_dir)
+    if verbose:
+        print(f"[완료] 파이프라인 산출물이 '{out_dir}'에 모였습니다.")
+    return dirs
+
+def _merge(base, override):
+    """override의 값으로 base를 덮어쓴 새 설정 (dict는 한 단계 안쪽까지 병합)"""
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key].update(value)
+        else:
+            merged[key] = value
+    return merged
+
+if __name__ == "__main__":
+    run_pipeline()
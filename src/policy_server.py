@@ -0,0 +1,384 @@
+# src/policy_server.py
+import os
+import json
+import asyncio
+from collections import deque
+from time import monotonic, perf_counter
+
+import numpy as np
+
+from checkpoint import load_checkpoint, maze_hash
+from env import GridWorld
+from pipeline import make_maze
+from solver import ROLLOUT_GOAL, ROLLOUT_LOOP, greedy_rollout
+from training_jobs import LRUCache
+
+ROLLOUT_NAMES = {ROLLOUT_GOAL: "goal", ROLLOUT_LOOP: "loop"}
+
+def load_registry(path):
+    """
+    {미로 id: {"q_table": 체크포인트 경로, "maze": pipeline 미로 설정}} JSON을 읽는다.
+    (미로 설정은 {"size": 0}이면 기본 5×5 미로, 상대 경로는 레지스트리 파일 기준)
+    """
+    with open(path, encoding="utf-8") as f:
+        registry = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for spec in registry.values():
+        spec["q_table"] = os.path.join(base, spec["q_table"])
+    return registry
+
+def parse_cells(cells):
+    """[[r, c], ...] 목록을 (k, 2) int64 배열로 바꾼다. 모양이 다르거나 정수가 아닌 좌표가 있으면 ValueError"""
+    try:
+        arr = np.asarray(cells)
+    except ValueError:
+        raise ValueError("cells must be a list of [row, col] pairs") from None
+    if arr.size == 0 and arr.ndim <= 2:
+        return np.zeros((0, 2), dtype=np.int64)
+    if arr.ndim != 2 or arr.shape[1] != 2:
+        raise ValueError(f"cells must be a list of [row, col] pairs (got shape {arr.shape})")
+    if arr.dtype.kind not in "iu":
+        raise ValueError("cell coordinates must be integers")
+    return arr.astype(np.int64)
+
+class PolicyTable:
+    """
+    미로 하나의 Q-table을 메모리에 올려 두고 탐욕 행동과 전체 칸 rollout을 미리 계산해 둔다.
+    체크포인트 파일이 바뀌면(mtime, 크기) 다시 읽고 version을 올린다.
+    """
+    def __init__(self, maze_id, q_path, maze, check_interval=1.0):
+        self.maze_id = maze_id
+        self.q_path = q_path
+        self.grid, self.start, self.goal = maze
+        self.check_interval = check_interval
+        self.version = 0
+        self._stamp = None
+        self._checked = 0.0
+        self.reload()
+
+    def _file_stamp(self):
+        st = os.stat(self.q_path)
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self):
+        stamp = self._file_stamp()
+        if self.q_path.endswith(".csv"):
+            from visualize import load_q_table
+            Q, meta = np.asarray(load_q_table(self.q_path)), {}
+        else:
+            # 메모리에 상주시키고, 학습 중 파일이 교체되어도 영향받지 않도록 복사해서 읽음
+            Q, meta = load_checkpoint(self.q_path, mmap=False)
+        env = GridWorld(self.grid, self.start, self.goal, compact=len(Q) != np.asarray(self.grid).size)
+        if "maze_hash" in meta and meta["maze_hash"] != maze_hash(env):
+            raise ValueError(f"Checkpoint was trained on a different maze: {self.q_path}")
+        if Q.shape != (env.n_states, env.n_actions):
+            raise ValueError(f"Q shape {Q.shape} does not match maze {self.maze_id}")
+
+        self.env = env
+        self.greedy = np.argmax(Q, axis=1)
+        states = np.arange(env.n_states)
+        self.succ = env.next_state[states, self.greedy].astype(np.int64)
+        self.status, self.dist = greedy_rollout(env, Q)
+        self.version += 1
+        self._stamp = stamp
+
+    def maybe_reload(self):
+        """check_interval초마다 한 번만 파일을 확인한다. 다시 읽었으면 True"""
+        now = monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        try:
+            if self._file_stamp() == self._stamp:
+                return False
+            self.reload()
+        except (OSError, ValueError):
+            # 쓰는 중이거나 잘못된 파일이면 이전 Q를 계속 사용
+            return False
+        return True
+
+    def states_of(self, cells):
+        """(k, 2) 칸 좌표 → 상태 인덱스. 범위 밖과 벽은 -1"""
+        cells = parse_cells(cells)
+        rows, cols = cells[:, 0], cells[:, 1]
+        env = self.env
+        inside = (rows >= 0) & (rows < env.n_rows) & (cols >= 0) & (cols < env.n_cols)
+        states = np.full(len(cells), -1, dtype=np.int64)
+        states[inside] = env.cell_index[rows[inside], cols[inside]]
+        free = states >= 0
+        free[free] = env.grid[rows[free], cols[free]] != 1
+        return np.where(free, states, -1)
+
+    def actions(self, cells):
+        states = self.states_of(cells)
+        return np.where(states >= 0, self.greedy[np.maximum(states, 0)], -1)
+
+    def paths(self, states):
+        """
+        상태들에서 탐욕 정책을 따라간 칸 경로와 종료 이유("goal", "loop", "wall").
+        목표에 닿는 상태들은 미리 계산한 거리만큼 후속 상태 표를 한꺼번에 따라가고,
+        나머지(드문 경우)는 처음 반복되는 상태 직전까지 하나씩 따라간다.
+        """
+        env = self.env
+        states = np.asarray(states, dtype=np.int64)
+        out = [None] * len(states)
+        reach = self.status[states] == ROLLOUT_GOAL
+        idx = np.flatnonzero(reach)
+        if idx.size:
+            lengths = self.dist[states[idx]]
+            walk = np.empty((idx.size, int(lengths.max()) + 1), dtype=np.int64)
+            walk[:, 0] = states[idx]
+            for t in range(1, walk.shape[1]):
+                walk[:, t] = self.succ[walk[:, t - 1]]
+            for row, (i, n) in enumerate(zip(idx, lengths)):
+                out[i] = (walk[row, :n + 1], "goal")
+        for i in np.flatnonzero(~reach):
+            s, seen, path = int(states[i]), set(), []
+            while s not in seen:
+                seen.add(s)
+                path.append(s)
+                s = int(self.succ[s])
+            out[i] = (np.array(path), ROLLOUT_NAMES.get(int(self.status[states[i]]), "wall"))
+        return [(np.stack(np.divmod(env.state_cells[p], env.n_cols), axis=1).tolist(), why)
+                for p, why in out]
+
+class LatencyStats:
+    """최근 window개 요청의 처리 시간과 전체 처리량"""
+    def __init__(self, window=100_000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.items = 0
+        self.started = monotonic()
+
+    def record(self, seconds, items):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.items += items
+
+    def summary(self):
+        lat = np.asarray(self.latencies) * 1e3
+        elapsed = monotonic() - self.started
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99]) if lat.size else (0.0, 0.0, 0.0)
+        return {"requests": self.requests, "items": self.items,
+                "requests_per_s": self.requests / elapsed, "items_per_s": self.items / elapsed,
+                "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+class PolicyServer:
+    """
+    여러 미로의 Q-table을 미로 id로 메모리에 두고 HTTP(JSON)로 일괄 질의에 답한다.
+      POST /actions {"maze": id, "cells": [[r, c], ...]} → {"actions": [...]} (벽/범위 밖은 -1)
+      POST /paths   {"maze": id, "cells": [[r, c], ...]} → {"paths": [[[r, c], ...], ...], "ends": [...]}
+      GET  /mazes, GET /stats
+    경로는 (미로 id, Q 버전, 시작 상태) 키의 LRU 캐시에 두며, Q가 다시 로드되면 버전이 바뀌어 옛 경로는 쓰이지 않는다.
+    """
+    def __init__(self, registry, cache_size=4096, check_interval=1.0):
+        self.tables = {maze_id: PolicyTable(maze_id, spec["q_table"], make_maze(spec.get("maze", {})),
+                                            check_interval)
+                       for maze_id, spec in registry.items()}
+        self.path_cache = LRUCache(max_size=cache_size)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.stats = LatencyStats()
+
+    def _table(self, maze_id):
+        table = self.tables.get(maze_id)
+        if table is None:
+            raise KeyError(f"Unknown maze: {maze_id}")
+        table.maybe_reload()
+        return table
+
+    def query_actions(self, maze_id, cells):
+        table = self._table(maze_id)
+        return {"maze": maze_id, "version": table.version, "actions": table.actions(cells).tolist()}
+
+    def query_paths(self, maze_id, cells):
+        table = self._table(maze_id)
+        states = table.states_of(cells)
+        results = [None] * len(states)
+        missing = []
+        for i, s in enumerate(states.tolist()):
+            if s < 0:
+                results[i] = ([], "invalid")
+                continue
+            hit = self.path_cache.get((maze_id, table.version, s))
+            if hit is None:
+                missing.append(i)
+            else:
+                results[i] = hit
+                self.cache_hits += 1
+        self.cache_misses += len(missing)
+        if missing:
+            for i, result in zip(missing, table.paths(states[missing])):
+                self.path_cache.put((maze_id, table.version, int(states[i])), result)
+                results[i] = result
+        return {"maze": maze_id, "version": table.version,
+                "paths": [p for p, _ in results], "ends": [why for _, why in results]}
+
+    def mazes(self):
+        return {maze_id: {"shape": [t.env.n_rows, t.env.n_cols], "version": t.version, "q_table": t.q_path}
+                for maze_id, t in self.tables.items()}
+
+    def stats_summary(self):
+        lookups = self.cache_hits + self.cache_misses
+        return {**self.stats.summary(), "path_cache_size": len(self.path_cache),
+                "path_cache_hit_rate": self.cache_hits / lookups if lookups else 0.0}
+
+    def dispatch(self, method, target, body):
+        """(HTTP 상태 코드, 응답 dict, 처리한 칸 수)"""
+        try:
+            if method == "GET" and target == "/mazes":
+                return 200, self.mazes(), 0
+            if method == "GET" and target == "/stats":
+                return 200, self.stats_summary(), 0
+            if method == "POST" and target in ("/actions", "/paths"):
+                query = json.loads(body or b"{}")
+                if not isinstance(query, dict) or "maze" not in query:
+                    return 400, {"error": "request body must be a JSON object with a 'maze' field"}, 0
+                cells = query.get("cells", [])
+                if target == "/actions":
+                    return 200, self.query_actions(query["maze"], cells), len(cells)
+                return 200, self.query_paths(query["maze"], cells), len(cells)
+            return 404, {"error": f"Unknown endpoint: {method} {target}"}, 0
+        except KeyError as e:
+            return 404, {"error": e.args[0]}, 0
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}, 0
+
+    async def handle(self, reader, writer):
+        """HTTP/1.1 keep-alive 연결 하나를 처리한다. (Content-Length 본문만 지원)"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+
+                t0 = perf_counter()
+                status, payload, items = self.dispatch(method, target, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.stats.record(perf_counter() - t0, items)
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                             % (status, b"OK" if status == 200 else b"Error", len(data)) + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None, ready=None):
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+def serve(registry, host="127.0.0.1", port=8765, unix_path=None, cache_size=4096, check_interval=1.0,
+          verbose=True, ready=None):
+    """레지스트리(dict 또는 JSON 경로)의 Q-table들을 올리고 질의 서버를 실행한다. (Ctrl+C로 종료)"""
+    if isinstance(registry, str):
+        registry = load_registry(registry)
+    server = PolicyServer(registry, cache_size=cache_size, check_interval=check_interval)
+    if verbose:
+        where = unix_path or f"http://{host}:{port}"
+        print(f"[서버] 미로 {len(server.tables)}개 ({', '.join(server.tables)}) | {where}")
+    try:
+        asyncio.run(server.serve(host, port, unix_path, ready))
+    except KeyboardInterrupt:
+        pass
+
+# --- 부하 생성기 ---
+
+async def _request(reader, writer, method, target, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: policy\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode("latin-1") + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = json.loads(await reader.readexactly(length))
+    if status != 200:
+        raise RuntimeError(f"{target}: {data.get('error')}")
+    return data
+
+async def _open(host, port, unix_path):
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path)
+    return await asyncio.open_connection(host, port)
+
+async def _load(host, port, unix_path, maze_id, kind, requests, batch, concurrency, hot_cells, seed):
+    reader, writer = await _open(host, port, unix_path)
+    mazes = await _request(reader, writer, "GET", "/mazes")
+    if maze_id is None:
+        maze_id = next(iter(mazes))
+    n_rows, n_cols = mazes[maze_id]["shape"]
+    rng = np.random.default_rng(seed)
+    # 실제 사용처처럼 일부 칸(hot_cells개)에 질의가 몰리도록 그 안에서 뽑음 (None이면 전체 칸에서 균등)
+    pool = rng.integers(0, [n_rows, n_cols], size=(hot_cells or n_rows * n_cols, 2))
+    actions = await _request(reader, writer, "POST", "/actions", {"maze": maze_id, "cells": pool.tolist()})
+    pool = pool[np.asarray(actions["actions"]) >= 0]   # 벽 칸은 빼고 질의
+
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        r, w = await _open(host, port, unix_path)
+        try:
+            for _ in counter:
+                cells = pool[rng.integers(len(pool), size=batch)].tolist()
+                t0 = perf_counter()
+                await _request(r, w, "POST", f"/{kind}", {"maze": maze_id, "cells": cells})
+                latencies.append(perf_counter() - t0)
+        finally:
+            w.close()
+
+    t0 = perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = perf_counter() - t0
+    server_stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+    lat = np.asarray(latencies) * 1e3
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {"maze": maze_id, "kind": kind, "requests": len(latencies), "batch": batch,
+            "concurrency": concurrency, "seconds": elapsed,
+            "requests_per_s": len(latencies) / elapsed, "cells_per_s": len(latencies) * batch / elapsed,
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "server": server_stats}
+
+def run_load(host="127.0.0.1", port=8765, unix_path=None, maze_id=None, kind="paths", requests=2000,
+             batch=32, concurrency=8, hot_cells=256, seed=0, verbose=True):
+    """
+    실행 중인 질의 서버에 concurrency개 연결로 requests번 일괄 질의(칸 batch개씩)를 보내고
+    클라이언트 기준 지연 백분위와 처리량, 서버 쪽 통계(/stats)를 돌려준다.
+    """
+    result = asyncio.run(_load(host, port, unix_path, maze_id, kind, requests, batch, concurrency,
+                               hot_cells, seed))
+    if verbose:
+        s = result["server"]
+        print(f"[부하] {result['kind']} x{result['requests']} (칸 {batch}개씩, 연결 {concurrency}개) | "
+              f"{result['requests_per_s']:,.0f} req/s, {result['cells_per_s']:,.0f} cells/s | "
+              f"p50 {result['p50_ms']:.2f}ms p95 {result['p95_ms']:.2f}ms p99 {result['p99_ms']:.2f}ms")
+        print(f"[서버] 처리 시간 p50 {s['p50_ms']:.3f}ms p95 {s['p95_ms']:.3f}ms p99 {s['p99_ms']:.3f}ms | "
+              f"경로 캐시 적중률 {s['path_cache_hit_rate']:.1%}")
+    return result
+
+if __name__ == "__main__":
+    serve({"default": {"q_table": os.path.join("results", "q_table.qckpt"), "maze": {"size": 0}}})
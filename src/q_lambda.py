@@ -0,0 +1,92 @@
+# src/q_lambda.py
+import numpy as np
+
+from q_learning import QLearningAgent
+
+class QLambdaAgent(QLearningAgent):
+    """
+    Watkins Q(λ) 에이전트. 목표 보상이 한 번의 갱신으로 최근에 지나온 여러 칸까지 전달된다.
+
+    자격 흔적(eligibility trace)은 n_states×4 배열 대신 최근 방문한 (상태, 행동)의
+    평탄화 번호와 값만 담은 작은 고정 크기 배열 두 개로 유지한다. 매 스텝 gamma*lam배로 줄이고
+    trace_threshold 아래로 내려간 항목은 버리며, max_traces개를 넘으면 값이 작은 것부터 버리므로
+    미로 크기와 상관없이 스텝당 비용이 일정하다.
+
+    trace_type: "replacing"(방문하면 1로) 또는 "accumulating"(방문할 때마다 +1)
+    Watkins 방식대로 탐욕이 아닌 행동을 고르면 흔적을 모두 지운다. 벽에 부딪혀 제자리에 머문 스텝도
+    흔적을 지우는데, 새 칸에서 아직 시도하지 않은 벽 방향을 고를 때마다 그 칸으로 들어온 이동까지
+    장애물 벌점을 받으면 새 칸으로 가는 길이 나빠 보여 큰 미로에서 탐험이 멈추기 때문이다.
+    """
+    def __init__(self, n_states, n_actions, lam=0.9, trace_type="replacing",
+                 trace_threshold=1e-3, max_traces=256, **kwargs):
+        super().__init__(n_states, n_actions, **kwargs)
+        if trace_type not in ("replacing", "accumulating"):
+            raise ValueError(f"Unknown trace_type: {trace_type}")
+        self.lam = lam
+        self.trace_type = trace_type
+        self.trace_threshold = trace_threshold
+        self.max_traces = max_traces
+        # 최대 max_traces + 1개 (이번 스텝에 추가되는 항목 포함) 크기의 고정 버퍼 앞부분만 사용
+        self.trace_keys = np.zeros(max_traces + 1, dtype=np.int64)
+        self.trace_values = np.zeros(max_traces + 1)
+        self.n_traces = 0
+        self._updated = ((), 0.0)
+
+    def reset_traces(self):
+        self.n_traces = 0
+
+    def choose_action(self, state):
+        action = super().choose_action(state)
+        # 탐험으로 고른 비탐욕 행동이면 그 이후 보상은 탐욕 정책의 것이 아니므로 흔적을 끊음
+        if self.n_traces and self.Q[state, action] < self.Q[state].max():
+            self.reset_traces()
+        return action
+
+    def learn(self, s, a, r, s_next, done):
+        target = r
+        if not done:
+            target = r + self.gamma * np.max(self.Q[s_next])
+        td_error = target - self.Q[s, a]
+
+        # 제자리 이동(벽 충돌)의 벌점은 그 (상태, 행동)에만 줌
+        n = 0 if s_next == s else self.n_traces
+        key = s * self.n_actions + a
+        hit = np.flatnonzero(self.trace_keys[:n] == key)
+        if hit.size:
+            if self.trace_type == "replacing":
+                self.trace_values[hit] = 1.0
+            else:
+                self.trace_values[hit] += 1.0
+        else:
+            self.trace_keys[n] = key
+            self.trace_values[n] = 1.0
+            n += 1
+
+        keys, values = self.trace_keys[:n], self.trace_values[:n]
+        Q = self.Q.reshape(-1)
+        Q[keys] += self.lr * td_error * values
+        self._updated = (keys // self.n_actions, abs(self.lr * td_error) * float(values.max()))
+
+        if done:
+            n = 0
+        else:
+            values *= self.gamma * self.lam
+            keep = values >= self.trace_threshold
+            if n > self.max_traces:
+                keep[np.argmin(values)] = False
+            if not keep.all():
+                m = int(keep.sum())
+                self.trace_keys[:m] = keys[keep]
+                self.trace_values[:m] = values[keep]
+                n = m
+        self.n_traces = n
+        return td_error
+
+    def updated_rows(self, s, td_error):
+        # 흔적이 남은 모든 (상태, 행동)이 함께 바뀜
+        return self._updated
+
+    def decay_epsilon(self):
+        # 엔진이 에피소드가 끝날 때마다 부르므로, 목표에 닿지 못하고 끝난 에피소드의 흔적도 여기서 비움
+        self.reset_traces()
+        super().decay_epsilon()
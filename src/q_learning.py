@@ -1,9 +1,9 @@
 # src/q_learning.py
 import numpy as np
-import random
 
 class QLearningAgent:
-    def __init__(self, n_states, n_actions, lr=0.1, gamma=0.99, epsilon=1.0, min_epsilon=0.01, decay=0.995):
+    def __init__(self, n_states, n_actions, lr=0.1, gamma=0.99, epsilon=1.0, min_epsilon=0.01, decay=0.995, seed=None,
+                 dtype=np.float64):
         self.n_states = n_states
         self.n_actions = n_actions
         self.lr = lr
@@ -11,11 +11,13 @@ class QLearningAgent:
         self.epsilon = epsilon
         self.min_epsilon = min_epsilon
         self.decay = decay
-        self.Q = np.zeros((n_states, n_actions))
+        self.rng = np.random.default_rng(seed)
+        # 큰 미로에서는 float32/float16으로 Q-table 메모리를 줄일 수 있음
+        self.Q = np.zeros((n_states, n_actions), dtype=dtype)
 
     def choose_action(self, state):
-        if random.random() < self.epsilon:
-            return random.randrange(self.n_actions)
+        if self.rng.random() < self.epsilon:
+            return int(self.rng.integers(self.n_actions))
         else:
             return int(np.argmax(self.Q[state]))
 
@@ -25,6 +27,49 @@ class QLearningAgent:
             target = r + self.gamma * np.max(self.Q[s_next])
         td_error = target - self.Q[s, a]
         self.Q[s, a] += self.lr * td_error
+        return td_error
+
+    def updated_rows(self, s, td_error):
+        """
+        마지막 learn(s, ...) 호출이 바꾼 Q 행 목록과 그중 가장 큰 값 변화량.
+        (계획 업데이트나 자격 흔적으로 여러 행을 바꾸는 에이전트는 재정의, 조기 종료 검사용)
+        """
+        return (s,), abs(self.lr * td_error)
+
+    def choose_action_batch(self, states):
+        """
+        여러 상태에 대해 epsilon-greedy 행동을 한 번에 고른다.
+        (env.VecGridWorld와 함께 쓰는 독립 유틸리티. TrainingEngine 학습 경로는 한 전이씩 쓰고 이 함수를 부르지 않음)
+        """
+        states = np.asarray(states, dtype=np.int64)
+        actions = np.argmax(self.Q[states], axis=1)
+        explore = self.rng.random(states.shape[0]) < self.epsilon
+        actions[explore] = self.rng.integers(self.n_actions, size=int(explore.sum()))
+        return actions
+
+    def learn_batch(self, s, a, r, s_next, done, sequential=False):
+        """
+        전이 배열을 한 번에 학습한다. (choose_action_batch와 같은 독립 유틸리티, 학습 엔진은 쓰지 않음)
+          sequential=False: 같은 Q 스냅샷에서 구한 TD 오차를 모두 더한다. (중복 쌍은 합산, 벡터화)
+          sequential=True : 배열 순서대로 한 전이씩 적용한다. 앞 전이가 바꾼 Q가 뒤 전이의 목표값에 반영되어
+                            같은 전이로 learn()을 차례로 부른 것과 같다. (파이썬 반복)
+        """
+        s = np.asarray(s, dtype=np.int64)
+        a = np.asarray(a, dtype=np.int64)
+        r = np.asarray(r, dtype=self.Q.dtype)
+        s_next = np.asarray(s_next, dtype=np.int64)
+        done = np.asarray(done, dtype=bool)
+
+        if not sequential:
+            target = r + np.where(done, 0.0, self.gamma * self.Q[s_next].max(axis=1))
+            td_error = target - self.Q[s, a]
+            np.add.at(self.Q, (s, a), self.lr * td_error)
+            return
+
+        Q, lr, gamma = self.Q, self.lr, self.gamma
+        for si, ai, ri, sn, d in zip(s.tolist(), a.tolist(), r.tolist(), s_next.tolist(), done.tolist()):
+            target = ri if d else ri + gamma * np.max(Q[sn])
+            Q[si, ai] += lr * (target - Q[si, ai])
 
     def decay_epsilon(self):
         self.epsilon = max(self.min_epsilon, self.epsilon * self.decay)
@@ -0,0 +1,160 @@
+# src/solver.py
+from collections import deque
+
+import numpy as np
+
+from env import GridWorld
+
+def q_from_values(env, V, gamma):
+    """Q(s, a) = r(s, a) + gamma * V(s') (종료 전이는 r만)"""
+    return env.reward + gamma * np.where(env.done, 0.0, V[env.next_state])
+
+def value_iteration(env, gamma=0.99, tol=1e-8, max_iter=100000):
+    """전이표 전체에 대한 벡터화 가치 반복. (V*, Q*, 최적 정책)을 돌려준다."""
+    V = np.zeros(env.n_states)
+    for _ in range(max_iter):
+        Q = q_from_values(env, V, gamma)
+        V_new = Q.max(axis=1)
+        delta = np.max(np.abs(V_new - V))
+        V = V_new
+        if delta < tol:
+            break
+    Q = q_from_values(env, V, gamma)
+    return V, Q, np.argmax(Q, axis=1)
+
+def evaluate_policy(env, policy, gamma=0.99, tol=1e-10):
+    """
+    결정적 정책의 가치를 포인터 더블링으로 정확히 계산한다.
+    V(s) = B(s) + A(s) * V(succ(s)) 관계를 succ를 두 배씩 건너뛰며 합성하므로
+    경로 길이 L에 대해 O(N log L) 연산으로 끝난다.
+    종료 전이는 가상의 흡수 상태(인덱스 N)로 보낸다.
+    """
+    n = env.n_states
+    states = np.arange(n)
+    done = env.done[states, policy]
+    succ = np.append(np.where(done, n, env.next_state[states, policy]), n)
+    B = np.append(env.reward[states, policy], 0.0)
+    A = np.append(np.where(done, 0.0, gamma), 0.0)
+
+    v_max = np.max(np.abs(env.reward)) / max(1.0 - gamma, 1e-12)
+    max_rounds = int(np.ceil(np.log2(n + 1))) + 64
+    for _ in range(max_rounds):
+        if A.max() * v_max < tol:
+            break
+        B = B + A * B[succ]
+        A = A * A[succ]
+        succ = succ[succ]
+    return B[:n]
+
+def shortest_path_policy(env):
+    """
+    목표로 가는 최단 경로 정책을 역방향 BFS로 구한다. (도달 불가 상태는 즉시 보상이 최대인 행동)
+    정책 반복의 초기 정책으로 쓰면 개선이 칸마다 한 단계씩 퍼지는 것을 피할 수 있다.
+    """
+    n = env.n_states
+    flat_next = env.next_state.ravel()
+    flat_src = np.arange(flat_next.size) // 4
+    moved = np.flatnonzero(flat_next != flat_src)
+    order = moved[np.argsort(flat_next[moved], kind="stable")]
+    offsets = np.searchsorted(flat_next[order], np.arange(n + 1)).tolist()
+    pred = order.tolist()  # 평탄화된 (s, a) 번호 = s * 4 + a
+
+    policy = np.argmax(env.reward, axis=1)
+    seen = bytearray(n)
+    seen[env.goal_state] = 1
+    queue = deque([env.goal_state])
+    while queue:
+        t = queue.popleft()
+        for k in range(offsets[t], offsets[t + 1]):
+            s, a = divmod(pred[k], 4)
+            if not seen[s]:
+                seen[s] = 1
+                policy[s] = a
+                queue.append(s)
+    return policy
+
+def policy_iteration(env, gamma=0.99, tol=1e-10, max_iter=10000):
+    """정책 평가(포인터 더블링) + 벡터화 정책 개선. (V*, Q*, 최적 정책)을 돌려준다."""
+    policy = shortest_path_policy(env)
+    states = np.arange(env.n_states)
+    for _ in range(max_iter):
+        V = evaluate_policy(env, policy, gamma, tol)
+        Q = q_from_values(env, V, gamma)
+        # 현재 행동이 이미 최선이면 유지해 동점 사이를 오가지 않도록 함
+        keep = Q[states, policy] >= Q.max(axis=1) - tol
+        new_policy = np.where(keep, policy, np.argmax(Q, axis=1))
+        if np.array_equal(new_policy, policy):
+            break
+        policy = new_policy
+    return V, Q, policy
+
+def solve(env, gamma=0.99, tol=1e-10, method="policy"):
+    if method == "policy":
+        return policy_iteration(env, gamma, tol)
+    if method == "value":
+        return value_iteration(env, gamma, tol)
+    raise ValueError(f"Unknown method: {method}")
+
+def value_gap(q_table, env, V_star, Q_star, tol=1e-6):
+    """
+    학습된 Q와 최적해의 차이를 에피소드 실행 없이 계산한다.
+    벽과 목표 칸은 제외한다.
+    """
+    q_table = np.asarray(q_table)
+    mask = env.free_states
+    mask[env.goal_state] = False
+    V_learned = q_table.max(axis=1)
+    gap = np.abs(V_learned - V_star)[mask]
+    greedy = np.argmax(q_table, axis=1)
+    optimal = Q_star[np.arange(env.n_states), greedy] >= Q_star.max(axis=1) - tol
+    return {
+        "max_gap": float(gap.max()),
+        "mean_gap": float(gap.mean()),
+        "policy_agreement": float(optimal[mask].mean()),
+    }
+
+# greedy_rollout 상태 코드
+ROLLOUT_GOAL, ROLLOUT_LOOP, ROLLOUT_WALL = 0, 1, 2
+
+def greedy_rollout(env, q_table):
+    """
+    모든 상태에서 동시에 탐욕 정책을 따라가 본 결과를 포인터 더블링으로 계산한다.
+      status[s]: ROLLOUT_GOAL(목표 도달), ROLLOUT_LOOP(순환), ROLLOUT_WALL(벽/경계에 막혀 제자리)
+      dist[s]  : 목표까지 스텝 수 (도달하지 못하면 -1, 목표 칸은 0)
+    목표 도달 전이와 막힌 전이를 두 개의 가상 흡수 상태로 보내고 후속 상태를 두 배씩 건너뛰므로
+    O(N log N) 연산으로 끝나며, log2(N)번 뒤에도 흡수 상태에 닿지 않은 상태는 순환에 빠진 것이다.
+    """
+    n = env.n_states
+    states = np.arange(n)
+    policy = np.argmax(np.asarray(q_table), axis=1)
+    nxt = env.next_state[states, policy].astype(np.int64)
+    done = env.done[states, policy]
+    blocked = ~done & (nxt == states)
+    goal, wall = n, n + 1
+
+    succ = np.where(done, goal, np.where(blocked, wall, nxt))
+    succ[env.goal_state] = goal
+    succ = np.append(succ, [goal, wall])
+    length = np.append(np.where(blocked, 0, 1), [0, 0])
+    length[env.goal_state] = 0
+    for _ in range(int(np.ceil(np.log2(n + 2))) + 1):
+        length = length + length[succ]
+        succ = succ[succ]
+
+    end = succ[:n]
+    status = np.where(end == goal, ROLLOUT_GOAL, np.where(end == wall, ROLLOUT_WALL, ROLLOUT_LOOP))
+    dist = np.where(status == ROLLOUT_GOAL, length[:n], -1)
+    return status, dist
+
+def rollout_coverage(env, status):
+    """벽과 목표를 제외한 상태 중 탐욕 정책으로 목표에 도달하는 비율"""
+    mask = env.free_states
+    mask[env.goal_state] = False
+    return float(np.mean(status[mask] == ROLLOUT_GOAL))
+
+if __name__ == "__main__":
+    from mazes import default_maze
+    grid, start, goal = default_maze()
+    env = GridWorld(grid, start, goal)
+    V, Q, policy = solve(env)
+    print(np.round(V.reshape(env.n_rows, env.n_cols), 3))
@@ -0,0 +1,131 @@
+# src/sweep.py
+import os
+import json
+import time
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from train import train_and_save
+
+# 기본 탐색 공간 (값 목록은 격자 탐색, (low, high) 튜플은 무작위 탐색 범위)
+DEFAULT_SPACE = {
+    "lr": [0.05, 0.1, 0.3],
+    "gamma": [0.9, 0.99],
+    "decay": [0.99, 0.995],
+    "episodes": [1000, 2000],
+}
+
+def grid_space(space):
+    """모든 값 조합을 설정 dict 목록으로 만든다."""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def random_space(space, n_samples, seed=0):
+    """
+    space의 각 항목에서 n_samples개 설정을 무작위로 뽑는다.
+    목록이면 그중 하나를, (low, high) 튜플이면 구간에서 균등하게 뽑는다.
+    (양 끝이 모두 정수면 정수로 뽑음)
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_samples):
+        config = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[key] = int(rng.integers(low, high + 1))
+                else:
+                    config[key] = float(rng.uniform(low, high))
+            else:
+                config[key] = values[int(rng.integers(len(values)))]
+        configs.append(config)
+    return configs
+
+def run_id(config, seed):
+    key = json.dumps({"config": config, "seed": seed}, sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+def _read_summary(path):
+    data = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if "," in line:
+                k, v = line.strip().split(",", 1)
+                data[k.strip()] = v.strip()
+    return data
+
+def _run_one(rid, config, seed, runs_dir):
+    run_dir = os.path.join(runs_dir, rid)
+    t0 = time.perf_counter()
+    train_and_save(results_dir=run_dir, seed=seed, save_plots=False, verbose=False, **config)
+    wall_time = time.perf_counter() - t0
+
+    summary = _read_summary(os.path.join(run_dir, "summary.txt"))
+    conv = summary.get("수렴 에피소드", "-")
+    return {
+        "run_id": rid,
+        "seed": seed,
+        **config,
+        "final_success_rate": float(summary["최종 성공률"]),
+        "convergence_episode": int(conv) if conv != "-" else np.nan,
+        "wall_time": wall_time,
+    }
+
+def _load_results(path):
+    import pandas as pd
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def _save_results(df, path):
+    # 중간에 끊겨도 표가 깨지지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = path + ".tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def run_sweep(configs, results_path="results/sweep/sweep_results.csv",
+              seeds=(0,), workers=None):
+    """
+    configs × seeds 조합을 프로세스 풀에서 실행하고 결과 표를 results_path에 저장한다.
+    이미 결과 표에 있는 run_id는 건너뛰므로, 중단된 스윕을 같은 인자로 다시 실행하면 이어서 진행된다.
+    """
+    # pandas는 결과 표를 다루는 부모 프로세스에서만 불러옴 (작업 프로세스 시작을 가볍게)
+    import pandas as pd
+
+    results_dir = os.path.dirname(results_path) or "."
+    runs_dir = os.path.join(results_dir, "runs")
+    os.makedirs(runs_dir, exist_ok=True)
+
+    rows = _load_results(results_path).to_dict("records")
+    done_ids = {str(row["run_id"]) for row in rows}
+    pending = []
+    for config in configs:
+        for seed in seeds:
+            rid = run_id(config, seed)
+            if rid not in done_ids:
+                pending.append((rid, config, seed))
+    print(f"[스윕] 전체 {len(configs) * len(seeds)}개 중 {len(pending)}개 실행 (완료 {len(done_ids)}개 건너뜀)")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_one, rid, config, seed, runs_dir) for rid, config, seed in pending]
+        for i, fut in enumerate(as_completed(futures), 1):
+            row = fut.result()
+            rows.append(row)
+            _save_results(pd.DataFrame(rows), results_path)
+            print(f"[스윕] {i}/{len(pending)} run={row['run_id']} "
+                  f"최종 성공률={row['final_success_rate']:.3f} 시간={row['wall_time']:.1f}s")
+
+    print(f"[완료] 스윕 결과가 '{results_path}'에 저장되었습니다.")
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    run_sweep(grid_space(DEFAULT_SPACE))
@@ -0,0 +1,118 @@
+# src/trace_log.py
+import os
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from engine import Callback
+
+# 스텝 하나당 고정 길이 레코드 (헤더 없이 이어 붙인 원본 바이트, 17바이트)
+TRACE_DTYPE = np.dtype([
+    ("episode", "<u4"),
+    ("step", "<u4"),
+    ("state", "<u4"),
+    ("action", "u1"),
+    ("reward", "<f4"),
+])
+
+def read_trace(path):
+    """궤적 로그 전체를 읽기 전용 memmap 구조 배열로 연다. (비어 있으면 길이 0 배열)"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=TRACE_DTYPE)
+    return np.memmap(path, dtype=TRACE_DTYPE, mode="r")
+
+class TraceRecorder(Callback):
+    """
+    every 에피소드마다 한 에피소드의 모든 스텝 (episode, step, state, action, reward)을 path에 이어 쓰는 콜백.
+    레코드는 chunk_size개씩 모아 쓰므로 메모리 사용량이 일정하고, 로그 크기는 기록한 에피소드 수로 제한된다.
+    resume_episode가 주어지면 기존 로그에서 그 이후 기록을 잘라내고 이어서 쓴다.
+    (on_step 콜백이므로 backend="fused"와 병렬 학습에서는 쓸 수 없음)
+    """
+    def __init__(self, path, every=10, chunk_size=65536, resume_episode=None):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.path = path
+        self.every = every
+        self.chunk_size = chunk_size
+        self._buffer = np.zeros(chunk_size, dtype=TRACE_DTYPE)
+        self._n = 0
+        self._recording = False
+
+        if resume_episode is None or not os.path.exists(path):
+            open(path, "wb").close()
+        else:
+            keep = bisect_left(read_trace(path)["episode"], resume_episode)
+            with open(path, "r+b") as f:
+                f.truncate(keep * TRACE_DTYPE.itemsize)
+
+    def on_episode_start(self, engine, episode):
+        self._recording = episode % self.every == 0
+
+    def on_step(self, engine, episode, step, state, action, reward, s_next, done, td_error):
+        if not self._recording:
+            return
+        self._buffer[self._n] = (episode, step, state, action, reward)
+        self._n += 1
+        if self._n == self.chunk_size:
+            self.flush()
+
+    def on_checkpoint(self, engine, episode):
+        self.flush()
+
+    def on_train_end(self, engine):
+        self.flush()
+
+    def flush(self):
+        if self._n:
+            with open(self.path, "ab") as f:
+                f.write(self._buffer[:self._n].tobytes())
+            self._n = 0
+
+# --- 재생 쪽: 에피소드 열이 정렬되어 있으므로 이진 탐색으로 필요한 구간만 읽는다 ---
+
+def episode_bounds(trace, first, last=None):
+    """first~last(포함) 에피소드 레코드의 [lo, hi) 구간. last가 None이면 first 하나만."""
+    # np.searchsorted는 구조 배열의 열을 연속 배열로 복사하므로 bisect로 필요한 원소만 읽음
+    col = trace["episode"]
+    return bisect_left(col, first), bisect_right(col, first if last is None else last)
+
+def recorded_episodes(trace):
+    """로그에 기록된 에피소드 번호들 (에피소드마다 이진 탐색 한 번)"""
+    col = trace["episode"]
+    episodes = []
+    i = 0
+    while i < len(col):
+        ep = int(col[i])
+        episodes.append(ep)
+        i = bisect_right(col, ep, lo=i)
+    return np.array(episodes, dtype=np.int64)
+
+def episode_records(trace, episode):
+    """에피소드 하나의 레코드 (memmap 조각이므로 접근한 부분만 읽힌다)"""
+    lo, hi = episode_bounds(trace, episode)
+    return trace[lo:hi]
+
+def episode_cells(trace, episode, env):
+    """
+    에피소드에서 에이전트가 있던 칸 좌표 (n_steps + 1, 2).
+    마지막 칸은 마지막 레코드의 (상태, 행동)을 env 전이표로 한 번 더 진행해 얻는다.
+    """
+    records = episode_records(trace, episode)
+    if len(records) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    states = records["state"].astype(np.int64)
+    last = env.next_state[states[-1], int(records["action"][-1])]
+    cells = env.state_cells[np.append(states, last)]
+    return np.stack(np.divmod(cells, env.n_cols), axis=1)
+
+def visit_counts(trace, n_states, first=None, last=None, chunk_size=1_000_000):
+    """first~last 에피소드(None이면 끝까지)의 상태별 방문 횟수. 구간을 chunk_size 레코드씩 나눠 센다."""
+    lo, hi = 0, len(trace)
+    if first is not None or last is not None:
+        col = trace["episode"]
+        lo = 0 if first is None else bisect_left(col, first)
+        hi = len(trace) if last is None else bisect_right(col, last)
+    counts = np.zeros(n_states, dtype=np.int64)
+    for i in range(lo, hi, chunk_size):
+        counts += np.bincount(trace["state"][i:min(i + chunk_size, hi)], minlength=n_states)
+    return counts
@@ -1,70 +1,220 @@
 # src/train.py
 import os
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
+from checkpoint import agent_state, restore_agent, save_checkpoint
+from dyna import DynaQAgent
+from engine import Callback, EarlyStopping, SuccessStopping, TrainingEngine
 from env import GridWorld
+from mazes import default_maze
+from metrics import MetricsWriter, downsample_curves, read_metrics, summarize
+from q_lambda import QLambdaAgent
 from q_learning import QLearningAgent
-
-def default_maze():
-    grid = [
-        [0,0,0,0,0],
-        [0,1,1,1,0],
-        [0,0,0,1,0],
-        [0,1,0,0,0],
-        [0,0,0,1,0],
-    ]
-    start = (0,0)
-    goal = (4,4)
-    return grid, start, goal
+from solver import greedy_rollout, rollout_coverage, solve, value_gap
+from trace_log import TraceRecorder
+
+class ProgressPrinter(Callback):
+    """
+    every 에피소드마다 보상, epsilon, 최적 가치와의 차이를 출력.
+    stats(metrics.RollingStats)를 주면 최근 구간 평균 보상과 성공률도 함께 출력한다.
+    """
+    def __init__(self, episodes, V_star, Q_star, every=200, stats=None):
+        self.episodes = episodes
+        self.V_star = V_star
+        self.Q_star = Q_star
+        self.every = every
+        self.stats = stats
+
+    def on_episode_end(self, engine, result):
+        self.last_episode = result.episode + 1
+        if (result.episode + 1) % self.every == 0:
+            gap = value_gap(engine.agent.Q, engine.env, self.V_star, self.Q_star)
+            status, _ = greedy_rollout(engine.env, engine.agent.Q)
+            rolling = ""
+            if self.stats is not None:
+                rolling = (f"| 최근{len(self.stats.rewards)}평균={self.stats.rolling_reward:.2f} "
+                           f"성공률={self.stats.rolling_success:.2f} ")
+            print(f"Episode {result.episode+1}/{self.episodes} | Reward={result.reward:.2f} {rolling}"
+                  f"| Epsilon={result.epsilon:.3f} | V*차이={gap['mean_gap']:.3f} "
+                  f"| 커버리지={rollout_coverage(engine.env, status):.3f}")
+
+    def on_train_end(self, engine):
+        if engine.stop_reason is not None:
+            print(f"[조기 종료] Episode {self.last_episode}: {engine.stop_reason}")
+
+class CheckpointWriter(Callback):
+    def __init__(self, path, hyperparameters):
+        self.path = path
+        self.hyperparameters = hyperparameters
+
+    def on_checkpoint(self, engine, episode):
+        save_checkpoint(self.path, engine.agent.Q,
+                        **agent_state(engine.agent, engine.env, episode, **self.hyperparameters))
+
+def make_agent(agent_type, n_states, n_actions, planning_steps=10, lam=0.9, trace_type="replacing", **kwargs):
+    if agent_type == "q":
+        return QLearningAgent(n_states, n_actions, **kwargs)
+    if agent_type == "qlambda":
+        return QLambdaAgent(n_states, n_actions, lam=lam, trace_type=trace_type, **kwargs)
+    if agent_type in ("dyna", "prioritized"):
+        return DynaQAgent(n_states, n_actions, planning_steps=planning_steps,
+                          prioritized=agent_type == "prioritized", **kwargs)
+    raise ValueError(f"Unknown agent_type: {agent_type}")
 
 def train_and_save(results_dir="results",
                    episodes=2000,
                    max_steps=100,
                    lr=0.1, gamma=0.99,
-                   epsilon=1.0, min_epsilon=0.01, decay=0.995):
+                   epsilon=1.0, min_epsilon=0.01, decay=0.995,
+                   seed=None, save_plots=True, verbose=True,
+                   maze=None, compact=False, dtype=np.float64,
+                   policy_patience=None, q_tol=None, q_window=100,
+                   success_threshold=None, success_window=100,
+                   agent_type="q", planning_steps=10, lam=0.9, trace_type="replacing",
+                   resume_from=None, checkpoint_every=None, save_csv=False,
+                   callbacks=(), backend="python", workers=1, lock_stripes=0, worker_schedules=None,
+                   trace_every=None, q_init=None):
+    """
+    agent_type: "q" (Q-러닝), "dyna" (Dyna-Q), "prioritized" (우선순위 스위핑 Dyna-Q),
+                "qlambda" (Watkins Q(λ), lam과 trace_type="replacing"/"accumulating" 사용)
+
+    Q-table은 results_dir/q_table.qckpt (checkpoint.py 이진 형식)로 저장되고, save_csv=True면 CSV도 함께 쓴다.
+    checkpoint_every 에피소드마다 results_dir/checkpoint.qckpt를 갱신하며,
+    resume_from에 체크포인트 경로를 주면 Q, epsilon, RNG 상태, 에피소드 번호를 복원해 이어서 학습한다.
+    (Dyna 모델과 조기 종료 상태는 저장하지 않음)
+
+    조기 종료 조건 (None이면 사용하지 않음, 매 에피소드 검사):
+      policy_patience  : 탐욕 정책이 이 에피소드 수만큼 바뀌지 않으면 종료
+      q_tol, q_window  : 최근 q_window 에피소드의 최대 Q 변화량이 q_tol 미만이면 종료
+      success_threshold: 최근 success_window 에피소드 성공률이 이 값 이상이면 종료
+
+    에피소드 기록(보상, 스텝, 성공, epsilon, 경과 시간)은 results_dir/metrics.bin에 청크 단위로 이어 쓰고,
+    그래프와 summary.txt는 이 로그를 스트리밍으로 읽어 만든다. 반환하는 보상 배열도 로그의 memmap이다.
+
+    trace_every=k면 k 에피소드마다 한 에피소드의 모든 스텝을 results_dir/trace.bin에 기록한다.
+    (trace_log.py 형식, 재생/방문 히트맵용. backend="python" 단일 프로세스 학습에서만 사용 가능)
+
+    q_init을 주면 0 대신 그 값으로 Q를 시작한다. (다른 미로에서 옮겨 온 Q로 이어 학습, curriculum.py 참고)
+
+    callbacks에 engine.Callback 객체를 넘기면 학습 루프를 고치지 않고 진행 표시, 로깅, 프로파일링을 붙일 수 있다.
+
+    backend="fused"면 에피소드마다 컴파일된 커널(kernels.py, numba가 없으면 파이썬)을 쓴다.
+    같은 시드에서 결과는 "python"과 같으며, agent_type="q", float64 Q, policy_patience, q_tol 없이만 쓸 수 있다. (success_threshold는 가능)
+
+    workers > 1이면 parallel.ParallelTrainer로 여러 프로세스가 공유 메모리의 Q 하나를 함께 갱신한다.
+    lock_stripes=0은 잠금 없음(Hogwild), N은 행 번호 % N 잠금(agent_type="q"만). worker_schedules로 작업 프로세스별
+    epsilon/min_epsilon/decay를 줄 수 있다. 결과 파일은 단일 프로세스 학습과 같다.
+    (policy_patience, q_tol은 사용할 수 없고 시드가 같아도 실행마다 결과가 다를 수 있음)
+    """
     os.makedirs(results_dir, exist_ok=True)
 
-    grid, start, goal = default_maze()
-    env = GridWorld(grid=grid, start=start, goal=goal)
-    agent = QLearningAgent(env.n_states, env.n_actions,
-                           lr=lr, gamma=gamma,
-                           epsilon=epsilon, min_epsilon=min_epsilon, decay=decay)
-
-    rewards_per_episode = []
-    success_history = []  # ✅ 성공 여부 기록용 리스트
-
-    for ep in range(episodes):
-        state = env.reset()
-        total_reward = 0.0
-        success = 0
-
-        for step in range(max_steps):
-            action = agent.choose_action(state)
-            s_next, reward, done = env.step(action)
-            agent.learn(state, action, reward, s_next, done)
-            state = s_next
-            total_reward += reward
+    grid, start, goal = maze if maze is not None else default_maze()
+    env = GridWorld(grid=grid, start=start, goal=goal, compact=compact)
+    agent = make_agent(agent_type, env.n_states, env.n_actions,
+                       lr=lr, gamma=gamma,
+                       epsilon=epsilon, min_epsilon=min_epsilon, decay=decay,
+                       seed=seed, dtype=dtype, planning_steps=planning_steps,
+                       lam=lam, trace_type=trace_type)
+    if q_init is not None:
+        if np.shape(q_init) != agent.Q.shape:
+            raise ValueError(f"q_init shape {np.shape(q_init)} does not match Q {agent.Q.shape}")
+        agent.Q[:] = q_init
+    hyperparameters = {"lr": lr, "gamma": gamma, "min_epsilon": min_epsilon, "decay": decay,
+                       "max_steps": max_steps, "agent_type": agent_type, "seed": seed}
+    start_ep = 0
+    if resume_from is not None:
+        start_ep = restore_agent(agent, env, resume_from)
+        if start_ep >= episodes:
+            raise ValueError(f"Checkpoint is already at episode {start_ep} (episodes={episodes})")
+        if verbose:
+            print(f"[재개] '{resume_from}'에서 Episode {start_ep}부터 이어서 학습합니다.")
+
+    # 학습 도중 언제든 최적해와의 차이를 볼 수 있도록 V*, Q*를 미리 계산
+    V_star, Q_star, _ = solve(env, gamma=gamma)
+
+    metrics_path = os.path.join(results_dir, "metrics.bin")
+    metrics = MetricsWriter(metrics_path, resume_episode=start_ep if resume_from is not None else None)
+    engine_callbacks = [metrics]
+    if policy_patience is not None or q_tol is not None:
+        engine_callbacks.append(EarlyStopping(policy_patience, q_tol, q_window,
+                                              success_threshold, success_window))
+    elif success_threshold is not None:
+        # 성공률 조건만 있으면 스텝 훅이 필요 없는 콜백으로 (fused/병렬 학습에서도 사용 가능)
+        engine_callbacks.append(SuccessStopping(success_threshold, success_window))
+    if trace_every is not None:
+        engine_callbacks.append(TraceRecorder(os.path.join(results_dir, "trace.bin"), every=trace_every,
+                                              resume_episode=start_ep if resume_from is not None else None))
+    if checkpoint_every is not None:
+        engine_callbacks.append(CheckpointWriter(os.path.join(results_dir, "checkpoint.qckpt"),
+                                                 hyperparameters))
+    if verbose:
+        engine_callbacks.append(ProgressPrinter(episodes, V_star, Q_star, stats=metrics.stats))
+    engine_callbacks.extend(callbacks)
+
+    if workers > 1:
+        from parallel import ParallelTrainer
+        agent_kwargs = {"lr": lr, "gamma": gamma, "epsilon": agent.epsilon, "min_epsilon": min_epsilon,
+                        "decay": decay, "planning_steps": planning_steps, "lam": lam, "trace_type": trace_type}
+        engine = ParallelTrainer(env, agent, (grid, start, goal), agent_type, agent_kwargs,
+                                 workers=workers, max_steps=max_steps, callbacks=engine_callbacks,
+                                 checkpoint_every=checkpoint_every, lock_stripes=lock_stripes,
+                                 seed=seed, schedules=worker_schedules, backend=backend)
+    else:
+        engine = TrainingEngine(env, agent, max_steps=max_steps, callbacks=engine_callbacks,
+                                checkpoint_every=checkpoint_every, backend=backend)
+    engine.run(episodes, start_episode=start_ep)
+    stop_reason = engine.stop_reason or "최대 에피소드"
+    last_episode = start_ep + engine.episodes_run
 
-            if done:
-                success = 1
-                break
-
-        agent.decay_epsilon()
-        rewards_per_episode.append(total_reward)
-        success_history.append(success)
+    # --- 결과 저장 ---
+    save_checkpoint(os.path.join(results_dir, "q_table.qckpt"), agent.Q,
+                    **agent_state(agent, env, last_episode, **hyperparameters))
+    if save_csv:
+        import pandas as pd
+        q_df = pd.DataFrame(agent.Q)
+        q_df.to_csv(os.path.join(results_dir, "q_table.csv"), index=False)
 
-        if (ep + 1) % 200 == 0:
-            print(f"Episode {ep+1}/{episodes} | Reward={total_reward:.2f} | Epsilon={agent.epsilon:.3f}")
+    if save_plots:
+        save_training_plots(results_dir, metrics_path)
 
-    # --- 결과 저장 ---
-    q_df = pd.DataFrame(agent.Q)
-    q_df.to_csv(os.path.join(results_dir, "q_table.csv"), index=False)
+    # ✅ 요약 정보
+    stats = summarize(metrics_path)
+    conv_ep = stats["convergence_episode"]
+    gap = value_gap(agent.Q, env, V_star, Q_star)
+    rollout_status, rollout_dist = greedy_rollout(env, agent.Q)
+    start_dist = rollout_dist[env.start_state]
+    with open(os.path.join(results_dir, "summary.txt"), "w", encoding="utf-8") as f:
+        f.write(f"총 에피소드,{stats['episodes']}\n")
+        f.write(f"성공 횟수,{stats['success']}\n")
+        f.write(f"성공률,{stats['success']/stats['episodes']:.3f}\n")
+        f.write(f"평균 보상,{stats['mean_reward']:.3f}\n")
+        f.write(f"최종 성공률,{stats['final_success_rate']:.3f}\n")
+        f.write(f"수렴 에피소드,{conv_ep if conv_ep is not None else '-'}\n")
+        f.write(f"최적 가치 평균 차이,{gap['mean_gap']:.4f}\n")
+        f.write(f"최적 가치 최대 차이,{gap['max_gap']:.4f}\n")
+        f.write(f"최적 행동 일치율,{gap['policy_agreement']:.3f}\n")
+        f.write(f"정책 커버리지,{rollout_coverage(env, rollout_status):.3f}\n")
+        f.write(f"시작점 경로 길이,{start_dist if start_dist >= 0 else '-'}\n")
+        f.write(f"종료 에피소드,{last_episode}\n")
+        f.write(f"종료 사유,{stop_reason}\n")
+        f.write(f"실제 환경 스텝,{stats['total_steps']}\n")
+        f.write(f"계획 업데이트,{getattr(agent, 'planning_updates', 0)}\n")
+
+    if verbose:
+        print(f"[시간] {engine.timing_report()}")
+        print(f"[완료] 학습이 끝났습니다. 결과가 '{results_dir}' 폴더에 저장되었습니다.")
+    return agent, read_metrics(metrics_path)["reward"][metrics.start_index:]
+
+def save_training_plots(results_dir, metrics_path):
+    # matplotlib은 그래프를 그릴 때만 불러와 그래프 없는 학습(스윕, 배치 작업)의 시작을 가볍게 함
+    import matplotlib.pyplot as plt
+
+    # 로그를 한 번 훑어 최대 2000개 점으로 줄인 곡선만 그림
+    x, rewards, success_rate = downsample_curves(metrics_path)
 
     # ✅ 보상 그래프
     plt.figure()
-    plt.plot(rewards_per_episode)
+    plt.plot(x, rewards)
     plt.xlabel("에피소드")
     plt.ylabel("총 보상")
     plt.title("에피소드별 학습 보상 변화")
@@ -74,9 +224,8 @@ def train_and_save(results_dir="results",
     plt.close()
 
     # ✅ 성공률 그래프
-    success_rate = np.cumsum(success_history) / np.arange(1, len(success_history)+1)
     plt.figure()
-    plt.plot(success_rate)
+    plt.plot(x, success_rate)
     plt.xlabel("에피소드")
     plt.ylabel("성공률")
     plt.title("시간에 따른 성공률 변화")
@@ -85,16 +234,6 @@ def train_and_save(results_dir="results",
     plt.savefig(os.path.join(results_dir, "success_rate.png"))
     plt.close()
 
-    # ✅ 요약 정보
-    total_success = sum(success_history)
-    with open(os.path.join(results_dir, "summary.txt"), "w", encoding="utf-8") as f:
-        f.write(f"총 에피소드,{episodes}\n")
-        f.write(f"성공 횟수,{total_success}\n")
-        f.write(f"성공률,{total_success/episodes:.3f}\n")
-
-    print(f"[완료] 학습이 끝났습니다. 결과가 '{results_dir}' 폴더에 저장되었습니다.")
-    return agent, rewards_per_episode
-
 if __name__ == "__main__":
     train_and_save()
 
@@ -0,0 +1,130 @@
+# src/training_jobs.py
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+
+from engine import Callback, TrainingEngine
+from env import GridWorld
+from trace_log import TraceRecorder
+from train import make_agent
+
+class LRUCache:
+    """최대 max_size개 항목을 유지하고, 넘치면 가장 오래 쓰지 않은 항목부터 버리는 스레드 안전 캐시"""
+    def __init__(self, max_size=16):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """key가 없을 때만 factory()로 만들어 넣는다. (동시에 같은 key를 요청해도 한 번만 생성)"""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key], False
+            value = factory()
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return value, True
+
+    def __len__(self):
+        return len(self._items)
+
+def job_key(grid, start, goal, agent_type, **params):
+    """미로와 하이퍼파라미터로 만든 캐시 키"""
+    return (tuple(map(tuple, grid)), tuple(start), tuple(goal), agent_type,
+            tuple(sorted(params.items())))
+
+class TrainingJob:
+    """
+    백그라운드 스레드에서 학습을 돌리고, batch_size 에피소드마다 진행 상황을 공개하는 작업.
+    화면 쪽은 snapshot()을 주기적으로 읽기만 하므로 여러 세션이 같은 작업을 함께 볼 수 있다.
+    trace_every가 주어지면 그 간격으로 에피소드 궤적을 임시 폴더의 trace.bin(trace_path)에 기록한다.
+    임시 폴더는 작업이 캐시에서 밀려나 더 이상 참조되지 않을 때(또는 프로세스가 끝날 때) 지운다.
+    """
+    def __init__(self, grid, start, goal, agent_type="q", episodes=1000, max_steps=100,
+                 batch_size=None, trace_every=None, **agent_kwargs):
+        self.env = GridWorld(grid, start, goal)
+        self.agent = make_agent(agent_type, self.env.n_states, self.env.n_actions, **agent_kwargs)
+        self.episodes = episodes
+        self.max_steps = max_steps
+        self.batch_size = batch_size or max(1, episodes // 50)
+        self.trace_every = trace_every
+        self.trace_path = None
+        if trace_every is not None:
+            trace_dir = tempfile.mkdtemp(prefix="qtrace-")
+            self.trace_path = os.path.join(trace_dir, "trace.bin")
+            weakref.finalize(self, shutil.rmtree, trace_dir, ignore_errors=True)
+
+        self.rewards = []
+        self.success = 0
+        self.real_steps = 0
+        self.episodes_done = 0
+        self.done = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.done
+
+    def snapshot(self):
+        """(끝난 에피소드 수, 보상 목록 사본, 성공 횟수, 완료 여부)"""
+        with self._lock:
+            return self.episodes_done, list(self.rewards), self.success, self.done
+
+    def _run(self):
+        try:
+            callbacks = [_BatchPublisher(self)]
+            if self.trace_path is not None:
+                callbacks.append(TraceRecorder(self.trace_path, every=self.trace_every))
+            engine = TrainingEngine(self.env, self.agent, max_steps=self.max_steps, callbacks=callbacks)
+            engine.run(self.episodes)
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._lock:
+                self.done = True
+
+class _BatchPublisher(Callback):
+    """에피소드 결과를 모아 두었다가 batch_size마다 한 번에 작업 상태로 옮긴다."""
+    def __init__(self, job):
+        self.job = job
+        self.rewards = []
+        self.success = 0
+        self.steps = 0
+
+    def on_episode_end(self, engine, result):
+        job = self.job
+        self.rewards.append(result.reward)
+        self.success += result.success
+        self.steps += result.steps
+        if (result.episode + 1) % job.batch_size == 0 or result.episode + 1 == job.episodes:
+            with job._lock:
+                job.rewards.extend(self.rewards)
+                job.success += self.success
+                job.real_steps += self.steps
+                job.episodes_done = result.episode + 1
+            self.rewards, self.success, self.steps = [], 0, 0
@@ -1,115 +1,318 @@
 # src/visualize.py
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd
+from matplotlib.colors import SymLogNorm
 import os
-import matplotlib.patches as patches
+import shutil
+import hashlib
 
-from env import GridWorld
+from checkpoint import load_checkpoint
+from env import GridWorld, cell_index_map
+from mazes import default_maze
+from solver import ROLLOUT_GOAL, ROLLOUT_LOOP, greedy_rollout, rollout_coverage, solve, value_gap
 
 ACTION_SYMBOL = {0: '^', 1: '>', 2: 'v', 3: '<'}
 MOVE = {0: (-1, 0), 1: (0, 1), 2: (1, 0), 3: (0, -1)}
+# .render_cache에 남길 최대 그림 수 (넘치면 가장 오래 쓰지 않은 것부터 삭제)
+RENDER_CACHE_MAX_FILES = 256
 
 def load_q_table(path):
-    return pd.read_csv(path).values
+    """CSV면 그대로 읽고, 그 외에는 이진 체크포인트를 메모리 매핑으로 연다."""
+    if path.endswith(".csv"):
+        import pandas as pd
+        return pd.read_csv(path).values
+    q_table, _ = load_checkpoint(path)
+    return q_table
 
 def best_action(q_table, state):
     return int(np.argmax(q_table[state]))
 
-def draw_policy(grid, q_table, start, goal, save_path):
-    n_rows = len(grid)
-    n_cols = len(grid[0])
-    fig, ax = plt.subplots(figsize=(n_cols, n_rows))
+def state_index(grid, q_table):
+    """Q-table 행 수로 일반/compact 상태 인덱싱을 판단해 칸 → 상태 표를 돌려준다."""
+    grid = np.asarray(grid)
+    return cell_index_map(grid, compact=len(q_table) != grid.size)
+
+# 이 칸 수 이하면 칸마다 글자(화살표, S, G)를 쓰고, 넘으면 quiver 화살표 한 번으로 그린다
+TEXT_LABEL_LIMIT = 400
+MAX_FIG_INCHES = 12
+
+def greedy_actions(grid, q_table):
+    """모든 칸의 탐욕 행동 (n_rows, n_cols). 벽은 -1"""
+    index = state_index(grid, q_table)
+    actions = np.full(index.shape, -1, dtype=np.int64)
+    valid = (index >= 0) & (np.asarray(grid) != 1)
+    actions[valid] = np.argmax(np.asarray(q_table)[index[valid]], axis=1)
+    return actions
+
+def _cell_colors(grid, start, goal):
+    grid = np.asarray(grid)
+    image = np.ones(grid.shape + (3,))
+    image[grid == 1] = (0.0, 0.0, 0.0)
+    image[start] = (0.68, 0.85, 0.90)   # lightblue
+    image[goal] = (0.56, 0.93, 0.56)    # lightgreen
+    return image
+
+def _new_axes(n_rows, n_cols):
+    scale = min(1.0, MAX_FIG_INCHES / max(n_rows, n_cols))
+    fig, ax = plt.subplots(figsize=(max(n_cols * scale, 2), max(n_rows * scale, 2)))
     ax.set_xlim(0, n_cols)
     ax.set_ylim(0, n_rows)
-    ax.set_xticks(np.arange(0, n_cols+1, 1))
-    ax.set_yticks(np.arange(0, n_rows+1, 1))
-    ax.grid(True)
+    if n_rows * n_cols <= TEXT_LABEL_LIMIT:
+        ax.set_xticks(np.arange(0, n_cols+1, 1))
+        ax.set_yticks(np.arange(0, n_rows+1, 1))
+        ax.grid(True)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
     ax.invert_yaxis()
+    return fig, ax
+
+def render_policy(ax, grid, q_table, start, goal, symbols=ACTION_SYMBOL):
+    """
+    벽/시작/목표는 imshow 한 번, 정책 화살표는 전체 Q의 argmax로 만든 quiver 한 번으로 그린다.
+    작은 미로(TEXT_LABEL_LIMIT 칸 이하)는 기존처럼 칸마다 글자를 쓴다.
+    """
+    grid = np.asarray(grid)
+    n_rows, n_cols = grid.shape
+    ax.imshow(_cell_colors(grid, start, goal), extent=(0, n_cols, n_rows, 0),
+              interpolation="nearest", zorder=0)
+    ax.set_xlim(0, n_cols)
+    ax.set_ylim(n_rows, 0)
+
+    actions = greedy_actions(grid, q_table)
+    actions[start] = -1
+    actions[goal] = -1
+    rows, cols = np.nonzero(actions >= 0)
+    a = actions[rows, cols]
+
+    if grid.size <= TEXT_LABEL_LIMIT:
+        for r, c, name in ((*start, "S"), (*goal, "G")):
+            ax.text(c+0.5, r+0.5, name, ha='center', va='center', fontsize=16, weight='bold')
+        for r, c, ai in zip(rows, cols, a):
+            ax.text(c+0.5, r+0.5, symbols[ai], ha='center', va='center', fontsize=14)
+    else:
+        delta = np.array(list(MOVE.values()))[a]
+        # y축이 뒤집혀 있으므로 화면 좌표에서 아래 방향이 +y
+        ax.quiver(cols + 0.5, rows + 0.5, delta[:, 1], -delta[:, 0],
+                  angles="xy", scale_units="xy", scale=1.6, pivot="middle",
+                  width=0.6 / max(n_rows, n_cols), headwidth=3, color="dimgray")
 
-    # 그리드 시각화
-    for r in range(n_rows):
-        for c in range(n_cols):
-            if grid[r][c] == 1:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='black'))
-            elif (r, c) == start:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='lightblue'))
-                ax.text(c+0.5, r+0.5, "S", ha='center', va='center', fontsize=16, weight='bold')
-            elif (r, c) == goal:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='lightgreen'))
-                ax.text(c+0.5, r+0.5, "G", ha='center', va='center', fontsize=16, weight='bold')
-            else:
-                s = r * n_cols + c
-                a = best_action(q_table, s)
-                ax.text(c+0.5, r+0.5, ACTION_SYMBOL[a], ha='center', va='center', fontsize=14)
-
-    plt.title("Learned Policy (Q-Learning)")
-    plt.savefig(save_path)
-    plt.close()
-
-def visualize_path(grid, q_table, start, goal, save_path):
-    """최적 경로를 따라 이동하는 모습을 화살표로 그리기"""
-    n_rows = len(grid)
-    n_cols = len(grid[0])
+def greedy_path(grid, q_table, start, goal, max_steps=None):
+    """시작점에서 탐욕 정책을 따라간 경로. 목표 도달, 재방문, 벽/범위 밖에서 멈춘다."""
+    grid = np.asarray(grid)
+    n_rows, n_cols = grid.shape
+    actions = greedy_actions(grid, q_table)
+    max_steps = max_steps or grid.size
     path = [start]
     pos = start
     visited = set()
 
-    for _ in range(100):
-        s = pos[0] * n_cols + pos[1]
-        a = best_action(q_table, s)
-        dr, dc = MOVE[a]
+    for _ in range(max_steps):
+        dr, dc = MOVE[int(actions[pos])]
         next_pos = (pos[0] + dr, pos[1] + dc)
         if next_pos == goal:
             path.append(goal)
             break
-        if next_pos in visited or not (0 <= next_pos[0] < n_rows and 0 <= next_pos[1] < n_cols) or grid[next_pos[0]][next_pos[1]] == 1:
+        if next_pos in visited or not (0 <= next_pos[0] < n_rows and 0 <= next_pos[1] < n_cols) or grid[next_pos] == 1:
             break
         path.append(next_pos)
         visited.add(pos)
         pos = next_pos
+    return path
+
+_render_version = None
+
+def _render_code_version():
+    """그리는 코드(visualize.py와 의존 모듈)와 matplotlib 버전의 해시. 코드가 바뀌면 예전 그림을 쓰지 않는다."""
+    global _render_version
+    if _render_version is None:
+        import matplotlib
+        from pipeline import code_version
+        _render_version = code_version("visualize") + matplotlib.__version__
+    return _render_version
+
+def _render_key(kind, grid, q_table, start, goal):
+    """그림은 탐욕 행동에만 의존하므로 그리는 코드 버전 + 미로 + argmax 정책으로 캐시 키를 만든다."""
+    h = hashlib.sha256(kind.encode("utf-8"))
+    h.update(_render_code_version().encode("utf-8"))
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    h.update(repr((grid.shape, tuple(start), tuple(goal))).encode("utf-8"))
+    h.update(grid.tobytes())
+    h.update(np.ascontiguousarray(greedy_actions(grid, q_table), dtype=np.int8).tobytes())
+    return h.hexdigest()[:24]
+
+def _cached(kind, grid, q_table, start, goal, save_path, cache_dir, draw):
+    """같은 미로·정책의 그림이 캐시에 있으면 복사만 하고, 없으면 draw(경로)로 그린 뒤 캐시에 넣는다."""
+    if cache_dir is None:
+        draw(save_path)
+        return
+    if cache_dir == "auto":
+        cache_dir = os.path.join(os.path.dirname(save_path) or ".", ".render_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    ext = os.path.splitext(save_path)[1] or ".png"
+    cache_path = os.path.join(cache_dir, _render_key(kind, grid, q_table, start, goal) + ext)
+    if os.path.exists(cache_path):
+        os.utime(cache_path)
+    else:
+        draw(cache_path)
+        _prune_cache(cache_dir, RENDER_CACHE_MAX_FILES)
+    shutil.copyfile(cache_path, save_path)
+
+def _prune_cache(cache_dir, max_files):
+    """캐시 그림이 max_files개를 넘으면 수정 시각이 오래된 것부터 지운다. (적중 시 시각을 갱신하므로 LRU)"""
+    entries = [e for e in os.scandir(cache_dir) if e.is_file()]
+    if len(entries) <= max_files:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for e in entries[:len(entries) - max_files]:
+        try:
+            os.remove(e.path)
+        except FileNotFoundError:
+            pass
+
+def draw_policy(grid, q_table, start, goal, save_path, cache_dir="auto"):
+    """cache_dir="auto"면 save_path 옆 .render_cache에 캐시, None이면 캐시하지 않음"""
+    grid = np.asarray(grid)
+
+    def draw(path):
+        fig, ax = _new_axes(*grid.shape)
+        render_policy(ax, grid, q_table, start, goal)
+        ax.set_title("Learned Policy (Q-Learning)")
+        fig.savefig(path)
+        plt.close(fig)
 
-    # 시각화
-    fig, ax = plt.subplots(figsize=(n_cols, n_rows))
+    _cached("policy", grid, q_table, start, goal, save_path, cache_dir, draw)
+
+def visualize_path(grid, q_table, start, goal, save_path, cache_dir="auto"):
+    """최적 경로를 선 하나로 그리기"""
+    grid = np.asarray(grid)
+
+    def draw(path):
+        n_rows, n_cols = grid.shape
+        fig, ax = _new_axes(n_rows, n_cols)
+        ax.imshow(_cell_colors(grid, start, goal), extent=(0, n_cols, n_rows, 0),
+                  interpolation="nearest", zorder=0)
+        ax.set_xlim(0, n_cols)
+        ax.set_ylim(n_rows, 0)
+        cells = np.array(greedy_path(grid, q_table, start, goal))
+        ax.plot(cells[:, 1] + 0.5, cells[:, 0] + 0.5, color='red',
+                linewidth=max(0.5, 3 * min(1.0, 20 / max(n_rows, n_cols))))
+        if len(cells) > 1:
+            (y0, x0), (y1, x1) = cells[-2], cells[-1]
+            ax.annotate("", xy=(x1+0.5, y1+0.5), xytext=(x0+0.5, y0+0.5),
+                        arrowprops=dict(arrowstyle="->", color="red"))
+        ax.set_title("Optimal Path After Learning")
+        fig.savefig(path)
+        plt.close(fig)
+
+    _cached("path", grid, q_table, start, goal, save_path, cache_dir, draw)
+
+def draw_rollout_map(grid, q_table, start, goal, save_path):
+    """
+    모든 칸에서 탐욕 정책을 따라갔을 때 목표까지의 스텝 수(색), 순환(빨강), 벽에 막힘(주황)을 그린다.
+    정책 커버리지(목표에 도달하는 빈칸 비율)를 돌려준다.
+    """
+    grid = np.asarray(grid)
+    n_rows, n_cols = grid.shape
+    env = GridWorld(grid, start, goal, compact=len(q_table) != grid.size)
+    status, dist = greedy_rollout(env, q_table)
+    coverage = rollout_coverage(env, status)
+
+    # 상태 → 칸 좌표로 펼친 RGB 이미지
+    reached = status == ROLLOUT_GOAL
+    max_dist = max(int(dist.max()), 1)
+    colors = plt.cm.viridis(dist / max_dist)[:, :3]
+    colors[status == ROLLOUT_LOOP] = (0.85, 0.15, 0.15)
+    colors[~reached & (status != ROLLOUT_LOOP)] = (1.0, 0.6, 0.0)
+    image = np.zeros((grid.size, 3))
+    image[env.state_cells] = colors
+    image = image.reshape(n_rows, n_cols, 3)
+    image[grid == 1] = (0.0, 0.0, 0.0)
+
+    fig, ax = _new_axes(n_rows, n_cols)
+    ax.imshow(image, extent=(0, n_cols, n_rows, 0), interpolation="nearest")
     ax.set_xlim(0, n_cols)
-    ax.set_ylim(0, n_rows)
-    ax.set_xticks(np.arange(0, n_cols+1, 1))
-    ax.set_yticks(np.arange(0, n_rows+1, 1))
-    ax.grid(True)
-    ax.invert_yaxis()
+    ax.set_ylim(n_rows, 0)
+    mappable = plt.cm.ScalarMappable(cmap="viridis", norm=plt.Normalize(0, max_dist))
+    fig.colorbar(mappable, ax=ax, label="steps to goal")
+    ax.set_title(f"Greedy Rollout Map (coverage {coverage:.1%})")
+    fig.savefig(save_path)
+    plt.close(fig)
+    return coverage
 
-    # 장애물 및 목표 표시
-    for r in range(n_rows):
-        for c in range(n_cols):
-            if grid[r][c] == 1:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='black'))
-            elif (r, c) == start:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='lightblue'))
-            elif (r, c) == goal:
-                ax.add_patch(patches.Rectangle((c, r), 1, 1, color='lightgreen'))
-
-    # 경로 시각화
-    for i in range(len(path)-1):
-        y, x = path[i]
-        ny, nx = path[i+1]
-        ax.arrow(x+0.5, y+0.5, (nx-x)*0.8, (ny-y)*0.8,
-                 head_width=0.2, length_includes_head=True, color='red')
-
-    plt.title("Optimal Path After Learning")
-    plt.savefig(save_path)
-    plt.close()
+def render_trace(ax, grid, start, goal, cells):
+    """기록된 에피소드의 지나온 칸(cells, (n, 2))을 선으로, 마지막 칸을 점으로 그린다."""
+    grid = np.asarray(grid)
+    n_rows, n_cols = grid.shape
+    ax.imshow(_cell_colors(grid, start, goal), extent=(0, n_cols, n_rows, 0),
+              interpolation="nearest", zorder=0)
+    ax.set_xlim(0, n_cols)
+    ax.set_ylim(n_rows, 0)
+    if len(cells):
+        ax.plot(cells[:, 1] + 0.5, cells[:, 0] + 0.5, color="red", alpha=0.5,
+                linewidth=max(0.5, 3 * min(1.0, 20 / max(n_rows, n_cols))))
+        ax.plot(cells[-1, 1] + 0.5, cells[-1, 0] + 0.5, "o", color="red",
+                markersize=max(3, 12 * min(1.0, 20 / max(n_rows, n_cols))))
 
-if __name__ == "__main__":
-    grid = [
-        [0,0,0,0,0],
-        [0,1,1,1,0],
-        [0,0,0,1,0],
-        [0,1,0,0,0],
-        [0,0,0,1,0],
-    ]
-    start, goal = (0,0), (4,4)
-    q = load_q_table("results/q_table.csv")
-    os.makedirs("results", exist_ok=True)
-    draw_policy(grid, q, start, goal, "results/policy_visual.png")
-    visualize_path(grid, q, start, goal, "results/path_visual.png")
+def render_visits(ax, env, counts):
+    """상태별 방문 횟수를 로그 색 척도의 칸 이미지로 그린다. (벽은 검정) 색 막대용 이미지를 돌려준다."""
+    image = np.full(env.grid.size, np.nan)
+    image[env.state_cells] = counts
+    image = image.reshape(env.grid.shape)
+    image[env.grid == 1] = np.nan
+    cmap = plt.cm.YlOrRd.copy()
+    cmap.set_bad((0.0, 0.0, 0.0))
+    n_rows, n_cols = env.grid.shape
+    im = ax.imshow(np.ma.masked_invalid(image), cmap=cmap, extent=(0, n_cols, n_rows, 0),
+                   interpolation="nearest", norm=SymLogNorm(1, vmin=0))
+    ax.set_xlim(0, n_cols)
+    ax.set_ylim(n_rows, 0)
+    return im
+
+def draw_visit_heatmap(grid, start, goal, trace_path, save_path, compact=False):
+    """궤적 로그(trace_log.py)에 기록된 모든 에피소드의 상태 방문 횟수를 그린다."""
+    from trace_log import read_trace, recorded_episodes, visit_counts
 
+    env = GridWorld(grid, start, goal, compact=compact)
+    trace = read_trace(trace_path)
+    counts = visit_counts(trace, env.n_states)
+    fig, ax = _new_axes(*env.grid.shape)
+    fig.colorbar(render_visits(ax, env, counts), ax=ax, label="visits")
+    ax.set_title(f"State Visits ({len(recorded_episodes(trace))} recorded episodes)")
+    fig.savefig(save_path)
+    plt.close(fig)
+
+def visualize_results(results_dir="results", maze=None, q_path=None):
+    """
+    학습 결과(q_table.qckpt, 없으면 q_table.csv)로 정책/경로/전체 칸 분석 그림을 results_dir에 만든다.
+    궤적 로그(trace.bin)가 있으면 상태 방문 히트맵도 그린다.
+    최적해와의 비교는 체크포인트에 저장된 gamma로 계산한다. (CSV나 gamma가 없는 파일이면 0.99)
+    """
+    grid, start, goal = maze if maze is not None else default_maze()
+    if q_path is None:
+        q_path = os.path.join(results_dir, "q_table.qckpt")
+        if not os.path.exists(q_path):
+            q_path = os.path.join(results_dir, "q_table.csv")
+    gamma = 0.99
+    if q_path.endswith(".csv"):
+        q = load_q_table(q_path)
+    else:
+        q, meta = load_checkpoint(q_path)
+        gamma = meta.get("hyperparameters", {}).get("gamma", gamma)
+    os.makedirs(results_dir, exist_ok=True)
+    env = GridWorld(grid, start, goal, compact=len(q) != np.asarray(grid).size)
+    V_star, Q_star, _ = solve(env, gamma=gamma)
+    gap = value_gap(q, env, V_star, Q_star)
+    print(f"최적 가치 평균 차이={gap['mean_gap']:.4f} | 최대 차이={gap['max_gap']:.4f} "
+          f"| 최적 행동 일치율={gap['policy_agreement']:.3f}")
+    draw_policy(grid, q, start, goal, os.path.join(results_dir, "policy_visual.png"))
+    visualize_path(grid, q, start, goal, os.path.join(results_dir, "path_visual.png"))
+    coverage = draw_rollout_map(grid, q, start, goal, os.path.join(results_dir, "rollout_map.png"))
+    print(f"정책 커버리지={coverage:.3f}")
+    trace_path = os.path.join(results_dir, "trace.bin")
+    if os.path.exists(trace_path):
+        draw_visit_heatmap(grid, start, goal, trace_path, os.path.join(results_dir, "visit_heatmap.png"),
+                           compact=env.compact)
+
+if __name__ == "__main__":
+    visualize_results()
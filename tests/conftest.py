@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# src/ 모듈을 `from engine import ...` 형태로 불러올 수 있게 함
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,52 @@
+# tests/test_engine.py
+import numpy as np
+
+from engine import EarlyStopping, TrainingEngine
+
+class _OneStepEnv:
+    """매 에피소드 한 스텝 만에 끝나는 환경"""
+    def reset(self):
+        return 0
+
+    def step(self, action):
+        return 0, 0.0, True
+
+class _FlipAgent:
+    """change_at 에피소드에서 상태 0의 탐욕 행동을 한 번 바꾸는 에이전트"""
+    def __init__(self, change_at=None):
+        self.Q = np.zeros((1, 2))
+        self.lr = 0.1
+        self.epsilon = 0.0
+        self.change_at = change_at
+        self.episode = 0
+
+    def choose_action(self, state):
+        return 0
+
+    def learn(self, s, a, r, s_next, done):
+        if self.episode == self.change_at:
+            self.Q[0] = [0.0, 1.0]
+        return 0.0
+
+    def updated_rows(self, s, td_error):
+        return (s,), 0.0
+
+    def decay_epsilon(self):
+        self.episode += 1
+
+def _stop_episode(patience, change_at=None, start_episode=0):
+    engine = TrainingEngine(_OneStepEnv(), _FlipAgent(change_at), max_steps=1,
+                            callbacks=[EarlyStopping(policy_patience=patience)], profile=False)
+    engine.agent.episode = start_episode
+    engine.run(100, start_episode=start_episode)
+    assert engine.stop_reason == "정책 안정"
+    return start_episode + engine.episodes_run - 1
+
+def test_policy_patience_counts_only_unchanged_episodes():
+    # 에피소드 3에서 바뀌면 4~8의 다섯 에피소드가 그대로인 8에서 종료
+    assert _stop_episode(5, change_at=3) == 8
+
+def test_policy_patience_without_change():
+    # 한 번도 안 바뀌면 0~4 다섯 에피소드 뒤 종료
+    assert _stop_episode(5) == 4
+    assert _stop_episode(5, start_episode=10) == 14
@@ -0,0 +1,21 @@
+# tests/test_parallel.py
+import pytest
+
+from env import GridWorld
+from mazes import default_maze
+from parallel import ParallelTrainer
+from train import make_agent
+
+@pytest.mark.parametrize("agent_type", ["dyna", "prioritized", "qlambda"])
+def test_striped_locks_reject_agents_writing_other_rows(agent_type):
+    maze = default_maze()
+    env = GridWorld(*maze)
+    agent = make_agent(agent_type, env.n_states, env.n_actions)
+    with pytest.raises(ValueError, match="striped locks"):
+        ParallelTrainer(env, agent, maze, agent_type, workers=2, lock_stripes=4)
+
+def test_striped_locks_accept_q_agent():
+    maze = default_maze()
+    env = GridWorld(*maze)
+    agent = make_agent("q", env.n_states, env.n_actions)
+    ParallelTrainer(env, agent, maze, "q", workers=2, lock_stripes=4)